@@ -0,0 +1,172 @@
+"""Module with the store of rendered thumbnails (derivatives).
+
+A derivative is the result of rendering a source image with a preset. Each
+derivative is identified by the source path, the preset, the version of the
+source, the output format and the render settings (encoder and decode mode),
+so replacing the original (or changing the settings) makes the old
+derivatives unreachable instead of serving a stale thumbnail.
+"""
+import os
+import time
+import logging
+import hashlib
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from django_base.libs.storage import list_files, open_or_none
+
+from .limits import check_file_size, render_slot
+from .presets import PRESET_CHOICES, get_option, get_quality
+from .renderer import DEFAULT_FORMAT, ENCODERS, encode, fit_presets, signature
+
+
+logger = logging.getLogger(__name__)
+
+
+def source_metadata(source, storage=default_storage):
+    """Return the version and the modified time of the source image.
+
+    The version is built from the size and the modified time of the file, so
+    it changes whenever the original is replaced without reading its content.
+    """
+    modified = storage.get_modified_time(source)
+    version = f'{storage.size(source):x}-{int(modified.timestamp()):x}'
+    return version, modified
+
+
+class DerivativeStore:
+    """Store of the rendered thumbnails.
+
+    The derivatives are saved in the storage under a hashed directory fan-out
+    (e.g. thumbnails/ab/cd/abcd...jpg), so millions of files are spread over
+    many prefixes instead of landing in a single directory.
+    """
+
+    def __init__(self, storage=None, location=None):
+        self.storage = storage or default_storage
+        self.location = location or settings.THUMBNAIL_DIR
+
+    # pylint: disable=no-self-use
+    def key(self, source, preset, version, output_format=DEFAULT_FORMAT):
+        """Return the hash that identifies the derivative."""
+        quality = get_quality(preset, output_format)
+        draft = get_option(preset, 'draft')
+        value = (f'{source}:{preset}:{version}:'
+                 f'{signature(output_format, quality)}:{draft}')
+        return hashlib.sha1(value.encode()).hexdigest()
+
+    def path(self, source, preset, version, output_format=DEFAULT_FORMAT):
+        """Return the path of the derivative in the storage."""
+        key = self.key(source, preset, version, output_format)
+        extension = ENCODERS[output_format][2]
+        return os.path.join(self.location, key[:2], key[2:4],
+                            f'{key}.{extension}')
+
+    def exists(self, source, preset, version, output_format=DEFAULT_FORMAT):
+        """Return True if the derivative was already rendered."""
+        return self.storage.exists(
+            self.path(source, preset, version, output_format))
+
+    def rendered_paths(self):
+        """Return the set of the paths of all the rendered derivatives.
+
+        Listing them is a request per 1000 derivatives on S3, instead of a
+        request per derivative with exists().
+        """
+        try:
+            return set(list_files(self.storage, self.location))
+        except FileNotFoundError:
+            return set()
+
+    def get(self, source, preset, version, output_format=DEFAULT_FORMAT):
+        """Return the content of the derivative or None if not rendered yet."""
+        file = open_or_none(self.storage, self.path(source, preset, version,
+                                                    output_format))
+        if file is None:
+            return None
+        with file:
+            return file.read()
+
+    def save(self, source, preset, version, content,
+             output_format=DEFAULT_FORMAT):
+        """Save the content of a rendered derivative in the storage."""
+        path = self.path(source, preset, version, output_format)
+        name = self.storage.save(path, ContentFile(content))
+
+        # Some storages don't overwrite existing files and save the content
+        # under an alternative name when another process won the race.
+        if name != path:
+            self.storage.delete(name)
+        return path
+
+    def render(self, source, version, presets, output_format=DEFAULT_FORMAT,
+               source_storage=None):
+        """Render the presets of the source in the format and save them.
+
+        The return is a dict with the presets and the content of the
+        derivatives (see render_formats).
+        """
+        return self.render_formats(source, version, {output_format: presets},
+                                   source_storage)[output_format]
+
+    def render_formats(self, source, version, presets, source_storage=None):
+        """Render the presets of the source and save them in the store.
+
+        The presets parameter is a dict with the output formats and the
+        presets to render in each one. The presets with the same decode mode
+        (the draft option) are rendered from a single decode of the source
+        and encoded in all their formats, with the quality of their options.
+        The return is a dict with the formats and, for each one, a dict with
+        the presets and the content of the derivatives.
+
+        The render holds a render slot of the process (RenderBusy is raised
+        when none is available) and sources exceeding the limits raise
+        ImageTooLarge before being decoded (see the limits module).
+        """
+        source_storage = source_storage or default_storage
+        formats = {}
+        for output_format, names in presets.items():
+            for preset in names:
+                formats.setdefault(preset, []).append(output_format)
+        groups = {}
+        for preset in formats:
+            groups.setdefault(get_option(preset, 'draft'), []).append(preset)
+
+        check_file_size(source_storage.size(source))
+        results = {output_format: {} for output_format in presets}
+        with render_slot():
+            for draft, group in groups.items():
+                self._render_group(source, source_storage,
+                                   {preset: formats[preset] for preset in group},
+                                   draft, results)
+
+        for output_format, contents in results.items():
+            for preset, content in contents.items():
+                self.save(source, preset, version, content, output_format)
+        return results
+
+    # pylint: disable=no-self-use
+    def _render_group(self, source, source_storage, formats, draft, results):
+        """Render the presets (a dict with their formats) from a single
+        decode of the source into the results."""
+        sizes = {preset: PRESET_CHOICES[preset] for preset in formats}
+
+        start = time.perf_counter()
+        image_file = open_or_none(source_storage, source)
+        if image_file is None:
+            raise FileNotFoundError(f'File does not exist: {source}')
+        with image_file:
+            for preset, image in fit_presets(image_file, sizes, draft):
+                for output_format in formats[preset]:
+                    results[output_format][preset] = encode(
+                        image, output_format,
+                        get_quality(preset, output_format))
+
+        # The memory of a render is measured by benchmark_thumbnails, in a new
+        # process for each mode, as the peak RSS of a worker hides it.
+        logger.info('Rendered %s (%s) in %.0f ms.', source,
+                    ', '.join(f'{preset}: {"/".join(formats[preset])}'
+                              for preset in formats),
+                    (time.perf_counter() - start) * 1000)
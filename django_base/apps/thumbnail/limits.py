@@ -0,0 +1,65 @@
+"""Module with the limits that keep the memory of the renders predictable.
+
+A worker renders at most THUMBNAIL_MAX_RENDERS images at the same time, and
+images larger than THUMBNAIL_MAX_FILE_SIZE bytes or THUMBNAIL_MAX_PIXELS
+pixels are refused before being decoded, so a single huge (or malicious)
+upload can't blow the memory of the worker.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+class ImageTooLarge(Exception):
+    """Exception raised when the image exceeds the limits of the renders."""
+
+
+class RenderBusy(Exception):
+    """Exception raised when the worker has no render slot available."""
+
+
+_semaphore = None
+_semaphore_lock = threading.Lock()
+
+
+def _get_semaphore():
+    """Return the semaphore with the render slots of the process."""
+    # pylint: disable=global-statement
+    global _semaphore
+    with _semaphore_lock:
+        if _semaphore is None:
+            _semaphore = threading.BoundedSemaphore(
+                settings.THUMBNAIL_MAX_RENDERS)
+    return _semaphore
+
+
+@contextmanager
+def render_slot():
+    """Hold one of the render slots of the process.
+
+    Waits up to THUMBNAIL_RENDER_WAIT seconds for a slot and raises
+    RenderBusy when none is released in time.
+    """
+    semaphore = _get_semaphore()
+    if not semaphore.acquire(timeout=settings.THUMBNAIL_RENDER_WAIT):
+        raise RenderBusy('No render slot available.')
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def check_file_size(size):
+    """Raise ImageTooLarge if the file size exceeds the limit."""
+    if size > settings.THUMBNAIL_MAX_FILE_SIZE:
+        raise ImageTooLarge(f'The file has {size} bytes, the limit is '
+                            f'{settings.THUMBNAIL_MAX_FILE_SIZE}.')
+
+
+def check_pixels(image_size):
+    """Raise ImageTooLarge if the number of pixels exceeds the limit."""
+    width, height = image_size
+    if width * height > settings.THUMBNAIL_MAX_PIXELS:
+        raise ImageTooLarge(f'The image has {width}x{height} pixels, the '
+                            f'limit is {settings.THUMBNAIL_MAX_PIXELS}.')
@@ -0,0 +1,176 @@
+"""Module with the locks used to render each thumbnail only once at a time.
+
+When a new image goes live many workers receive requests for the same
+thumbnail at the same time. The first one takes the lock and renders it, the
+others wait for the result instead of rendering it again (single-flight).
+
+The lock lives in the Django cache (shared between the workers when the cache
+is) or, with THUMBNAIL_LOCK = 'file', in lock files of a local directory.
+"""
+import os
+import time
+import uuid
+import asyncio
+import fcntl
+import hashlib
+import tempfile
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class CacheLock:
+    """Lock stored in the Django cache."""
+
+    def __init__(self, key, timeout):
+        self.key = f'thumbnail:lock:{key}'
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+
+    def acquire(self):
+        """Try to take the lock and return True if succeeded."""
+        return cache.add(self.key, self.token, self.timeout)
+
+    def locked(self):
+        """Return True if the lock is held by anyone."""
+        return cache.get(self.key) is not None
+
+    def release(self):
+        """Release the lock if it is still held by this instance."""
+        if cache.get(self.key) == self.token:
+            cache.delete(self.key)
+
+
+class FileLock:
+    """Lock stored as a file, for workers sharing the same disk.
+
+    The lock is an flock of the file held while the file is open, so the
+    system releases the lock of a dead process and there is no stale lock
+    to take over. The timeout isn't used.
+    """
+
+    def __init__(self, key, timeout, directory=None):
+        directory = directory or settings.THUMBNAIL_LOCK_DIR or \
+            os.path.join(tempfile.gettempdir(), 'thumbnail-locks')
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'{key}.lock')
+        self.timeout = timeout
+        self.descriptor = None
+
+    def acquire(self):
+        """Try to take the lock and return True if succeeded."""
+        descriptor = os.open(self.path, os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(descriptor)
+            return False
+
+        # The holder that released the lock may have removed the file after
+        # it was opened, then the lock of the removed file is worthless.
+        try:
+            same_file = os.stat(self.path).st_ino == os.fstat(descriptor).st_ino
+        except FileNotFoundError:
+            same_file = False
+        if not same_file:
+            os.close(descriptor)
+            return self.acquire()
+        self.descriptor = descriptor
+        return True
+
+    def locked(self):
+        """Return True if the lock is held by anyone."""
+        try:
+            descriptor = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        finally:
+            os.close(descriptor)
+        return False
+
+    def release(self):
+        """Release the lock if it is held by this instance."""
+        if self.descriptor is None:
+            return
+        # The file is removed before the lock is released, so the next
+        # holder never locks a file that is about to be removed.
+        os.unlink(self.path)
+        os.close(self.descriptor)
+        self.descriptor = None
+
+
+def get_lock(name):
+    """Return the lock of the name using the backend set in the settings."""
+    key = hashlib.sha1(name.encode()).hexdigest()
+    timeout = settings.THUMBNAIL_LOCK_TIMEOUT
+    if settings.THUMBNAIL_LOCK == 'file':
+        return FileLock(key, timeout)
+    return CacheLock(key, timeout)
+
+
+def _delays(wait):
+    """Yield the delays between the polls of a waiting caller.
+
+    The delays grow from 50ms to 500ms until the wait (THUMBNAIL_LOCK_WAIT by
+    default) is over.
+    """
+    wait = settings.THUMBNAIL_LOCK_WAIT if wait is None else wait
+    deadline = time.monotonic() + wait
+    delay = 0.05
+    while time.monotonic() < deadline:
+        yield delay
+        delay = min(delay * 2, 0.5)
+
+
+def single_flight(name, render, fetch, wait=None):
+    """Run the render only once among the concurrent callers of the name.
+
+    The caller that takes the lock runs the render function. The others poll
+    the fetch function until it returns the result, or run the render
+    themselves when the lock is released without a result or after waiting
+    for THUMBNAIL_LOCK_WAIT seconds.
+    """
+    lock = get_lock(name)
+    if lock.acquire():
+        try:
+            return render()
+        finally:
+            lock.release()
+
+    for delay in _delays(wait):
+        time.sleep(delay)
+        result = fetch()
+        if result is not None:
+            return result
+        if not lock.locked():
+            break
+    return render()
+
+
+async def asingle_flight(name, render, fetch, wait=None):
+    """Async version of single_flight, the render and fetch are coroutines.
+
+    The callers wait on the event loop, so only the render of the caller
+    that takes the lock holds a thread.
+    """
+    lock = get_lock(name)
+    if await sync_to_async(lock.acquire, thread_sensitive=False)():
+        try:
+            return await render()
+        finally:
+            await sync_to_async(lock.release, thread_sensitive=False)()
+
+    for delay in _delays(wait):
+        await asyncio.sleep(delay)
+        result = await fetch()
+        if result is not None:
+            return result
+        if not await sync_to_async(lock.locked, thread_sensitive=False)():
+            break
+    return await render()
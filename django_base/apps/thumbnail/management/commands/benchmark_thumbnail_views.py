@@ -0,0 +1,108 @@
+"""Module with the command that compares the sync and async generator views."""
+import os
+import time
+import asyncio
+from itertools import cycle, islice
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+
+from ...presets import PRESET_CHOICES
+from ...derivatives import DerivativeStore
+from ...views.generator import AsyncGeneratorView, GeneratorView
+
+
+class NullStore(DerivativeStore):
+    """Derivative store that never keeps anything, so every request renders."""
+
+    def exists(self, *args, **kwargs):
+        return False
+
+    def get(self, *args, **kwargs):
+        return None
+
+    def save(self, *args, **kwargs):
+        return None
+
+
+class Command(BaseCommand):
+    """Compare the throughput of the WSGI and the ASGI thumbnail views."""
+
+    help = ('Requests the thumbnails of an image in PHOTO_DIR through the '
+            'sync view (as a WSGI worker would) and through the async view '
+            '(as one ASGI process would) and reports the requests/sec.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='Name of the image in PHOTO_DIR.')
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Number of requests of each view.')
+        parser.add_argument('--threads', type=int, default=1,
+                            help='Threads of the WSGI worker (default: 1, '
+                                 'the gunicorn sync worker).')
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help='Requests in flight in the ASGI process.')
+        parser.add_argument('--cached', action='store_true',
+                            help='Use the derivative store instead of '
+                                 'rendering in every request.')
+
+    def handle(self, *args, **options):
+        if not default_storage.exists(os.path.join(settings.PHOTO_DIR,
+                                                   options['name'])):
+            raise CommandError(f'{options["name"]} not found in PHOTO_DIR.')
+
+        store = DerivativeStore() if options['cached'] else NullStore()
+        presets = list(islice(cycle(PRESET_CHOICES), options['requests']))
+        self.stdout.write(
+            f'{options["requests"]} requests, '
+            f'{"cached" if options["cached"] else "rendering"} thumbnails, '
+            f'{settings.THUMBNAIL_THREAD_POOL_SIZE} render threads.')
+
+        # Without a result in the store the waiters would only poll the lock.
+        with override_settings(THUMBNAIL_LOCK_WAIT=0):
+            elapsed = self.run_wsgi(store, presets, options)
+            self.report(f'WSGI ({options["threads"]} threads)',
+                        len(presets), elapsed)
+
+            elapsed = asyncio.run(self.run_asgi(store, presets, options))
+            self.report(f'ASGI ({options["concurrency"]} in flight)',
+                        len(presets), elapsed)
+
+    # pylint: disable=no-self-use
+    def run_wsgi(self, store, presets, options):
+        """Run the requests through the sync view and return the time."""
+        view = GeneratorView.as_view(store=store)
+        factory = RequestFactory()
+
+        def request(preset):
+            response = view(factory.get('/', {'preset': preset}),
+                            path=options['name'])
+            assert response.status_code == 200, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['threads']) as executor:
+            list(executor.map(request, presets))
+        return time.perf_counter() - start
+
+    async def run_asgi(self, store, presets, options):
+        """Run the requests through the async view and return the time."""
+        view = AsyncGeneratorView.as_view(store=store)
+        factory = AsyncRequestFactory()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request(preset):
+            async with semaphore:
+                response = await view(factory.get(f'/?preset={preset}'),
+                                      path=options['name'])
+            assert response.status_code == 200, response.status_code
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request(preset) for preset in presets))
+        return time.perf_counter() - start
+
+    def report(self, label, num_requests, elapsed):
+        """Write the throughput of a run."""
+        self.stdout.write(f'{label:>24}: {num_requests / elapsed:.1f} '
+                          f'requests/sec ({elapsed:.2f}s)')
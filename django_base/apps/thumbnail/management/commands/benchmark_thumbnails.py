@@ -0,0 +1,72 @@
+"""Module with the command that measures the render of the thumbnails."""
+import time
+import resource
+import statistics
+import multiprocessing
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...presets import PRESET_CHOICES, POSTER_SQUARED
+from ...renderer import render_presets
+
+
+def _measure_decode(data, sizes, draft, repeat, queue):
+    """Render the image repeatedly and put the timings and RSS in the queue.
+
+    Runs in a new process for each mode, so the peak RSS of a mode isn't
+    hidden by the peak of the other.
+    """
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render_presets(BytesIO(data), sizes, draft=draft)
+        timings.append(time.perf_counter() - start)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((timings, peak - baseline))
+
+
+class Command(BaseCommand):
+    """Measure the latency and the memory of the thumbnail rendering."""
+
+    help = ('Renders a local image with the full and the fast (draft) decode '
+            'and reports the latency and the peak RSS of each mode.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('image', help='Path of a local image file.')
+        parser.add_argument('--preset', action='append',
+                            choices=sorted(PRESET_CHOICES),
+                            help='Preset to render (can be repeated).')
+        parser.add_argument('--repeat', type=int, default=10,
+                            help='Number of renders of each mode.')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['image'], 'rb') as image_file:
+                data = image_file.read()
+        except OSError as error:
+            raise CommandError(str(error)) from error
+
+        presets = options['preset'] or [POSTER_SQUARED]
+        sizes = {preset: PRESET_CHOICES[preset] for preset in presets}
+        self.stdout.write(f'Rendering {", ".join(presets)} '
+                          f'{options["repeat"]} times.')
+
+        for mode, draft in (('full', False), ('draft', True)):
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_measure_decode,
+                args=(data, sizes, draft, options['repeat'], queue))
+            process.start()
+            timings, rss = queue.get()
+            process.join()
+            self.report(mode, timings, rss)
+
+    def report(self, mode, timings, rss):
+        """Write the statistics of a mode."""
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{mode:>6}: mean {statistics.mean(timings) * 1000:.1f} ms, '
+            f'p95 {p95 * 1000:.1f} ms, peak RSS +{rss / 1024:.1f} MB')
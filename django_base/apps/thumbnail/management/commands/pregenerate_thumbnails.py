@@ -0,0 +1,146 @@
+"""Module with the command that renders the thumbnails ahead of time."""
+import os
+import signal
+import time
+import multiprocessing
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from django_base.libs.storage import list_files, reset_connections
+
+from ...presets import PRESET_CHOICES
+from ...renderer import SUPPORTED_FORMATS
+from ...derivatives import DerivativeStore, source_metadata
+
+
+# Set in the worker processes by _init_worker.
+_stop_event = None
+_rendered_paths = None
+
+
+def _init_worker(stop_event, rendered_paths):
+    """Initialize a worker process of the pool.
+
+    The workers ignore SIGINT, so an interruption never kills them in the
+    middle of a write. Instead the main process sets the stop event and the
+    workers skip the remaining sources after finishing the current one.
+    The S3 connections opened by the main process (to list the files) are
+    dropped, as the forked workers can't share their sockets.
+    """
+    # pylint: disable=global-statement
+    global _stop_event, _rendered_paths
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    reset_connections(default_storage)
+    _stop_event = stop_event
+    _rendered_paths = rendered_paths
+
+
+def _render_source(source, formats):
+    """Render the missing presets of a source image in the formats.
+
+    The return is a tuple with the source, the number of rendered and skipped
+    thumbnails and the error message (None when succeeded).
+    """
+    if _stop_event is not None and _stop_event.is_set():
+        return source, 0, 0, None
+
+    store = DerivativeStore()
+    rendered = skipped = 0
+    try:
+        version, _ = source_metadata(source)
+        presets = {}
+        for output_format in formats:
+            missing = [
+                preset for preset in PRESET_CHOICES
+                if store.path(source, preset, version, output_format)
+                not in _rendered_paths
+            ]
+            skipped += len(PRESET_CHOICES) - len(missing)
+            if missing:
+                presets[output_format] = missing
+        if presets:
+            # All the formats are encoded from a single decode.
+            store.render_formats(source, version, presets)
+            rendered += sum(len(missing) for missing in presets.values())
+    except Exception as error:  # pylint: disable=broad-except
+        return source, rendered, skipped, str(error)
+    return source, rendered, skipped, None
+
+
+class Command(BaseCommand):
+    """Render all the presets of the images ahead of time."""
+
+    help = ('Renders every thumbnail preset of the images in PHOTO_DIR (or of '
+            'the given storage keys) in each output format. Thumbnails already rendered for the '
+            'current version of the image are skipped, so the command can be '
+            'interrupted and run again.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='*',
+                            help='Storage keys of the images to render.')
+        parser.add_argument('--processes', type=int,
+                            default=os.cpu_count() or 1,
+                            help='Number of worker processes (default: '
+                                 'number of cores).')
+        parser.add_argument('--format', action='append', dest='formats',
+                            choices=SUPPORTED_FORMATS,
+                            help='Output format to render (can be repeated, '
+                                 'default: all the supported formats).')
+
+    def handle(self, *args, **options):
+        sources = options['sources']
+        if not sources:
+            try:
+                sources = list_files(default_storage, settings.PHOTO_DIR)
+            except FileNotFoundError:
+                # Nothing to render yet (e.g. the first deploy), which must
+                # not fail the release.
+                self.stderr.write(self.style.WARNING(
+                    f'{settings.PHOTO_DIR} not found, no images to render.'))
+                return
+
+        # The derivatives already rendered are listed once, not checked
+        # one by one in the workers.
+        rendered_paths = DerivativeStore().rendered_paths()
+
+        # The connections can't be shared with the forked processes.
+        connections.close_all()
+
+        images = rendered = skipped = failed = 0
+        stop_event = multiprocessing.Event()
+        start = time.monotonic()
+
+        with multiprocessing.Pool(options['processes'], _init_worker,
+                                  (stop_event, rendered_paths)) as pool:
+            render_source = partial(_render_source,
+                                    formats=options['formats'] or
+                                    SUPPORTED_FORMATS)
+            results = pool.imap_unordered(render_source, sources)
+            try:
+                for source, num_rendered, num_skipped, error in results:
+                    if error:
+                        failed += 1
+                        self.stderr.write(f'{source}: {error}')
+                        continue
+                    images += 1
+                    rendered += num_rendered
+                    skipped += num_skipped
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'{source}: {num_rendered} rendered, '
+                                          f'{num_skipped} skipped.')
+            except KeyboardInterrupt:
+                stop_event.set()
+                self.stderr.write('Interrupted, waiting for the workers...')
+                pool.close()
+                pool.join()
+
+        elapsed = time.monotonic() - start
+        throughput = images / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{images} images ({rendered} thumbnails rendered, {skipped} '
+            f'skipped, {failed} failed) in {elapsed:.1f}s: '
+            f'{throughput:.1f} images/sec.'))
@@ -12,4 +12,53 @@ PRESET_CHOICES = {
     POSTER_PORTRAIT_2X: (480, 720),
     POSTER_LANDSCAPE: (720, 480),
     POSTER_LANDSCAPE_2X: (1440, 960)
-}
\ No newline at end of file
+}
+
+# Options used by the presets not listed in PRESET_OPTIONS, or by the options
+# a preset doesn't override.
+#   max_age: Cache-Control max-age (in seconds) used by the browsers.
+#   s_maxage: Cache-Control s-maxage (in seconds) used by the CDN.
+#   draft: Decode the source in the fast mode (see renderer.reduce).
+#   quality: Encoder quality of each output format (see renderer.ENCODERS).
+#            The formats a preset doesn't list use the default quality.
+DEFAULT_OPTIONS = {
+    'max_age': 86400,
+    's_maxage': 2592000,
+    'draft': True,
+    'quality': {'jpeg': 80, 'webp': 80, 'avif': 60},
+}
+
+PRESET_OPTIONS = {}
+
+
+def get_family(preset):
+    """Return the presets in the same aspect ratio of the preset.
+
+    The family of a preset (itself included) can be rendered from the same
+    decode of the source, e.g. POSTER_SQUARED and POSTER_SQUARED_2X.
+    """
+    width, height = PRESET_CHOICES[preset]
+    return [name for name, (other_width, other_height) in PRESET_CHOICES.items()
+            if width * other_height == height * other_width]
+
+
+def get_option(preset, name):
+    """Return the value of an option of the preset."""
+    return PRESET_OPTIONS.get(preset, {}).get(name, DEFAULT_OPTIONS[name])
+
+
+def get_quality(preset, output_format):
+    """Return the encoder quality of the preset in the output format."""
+    return get_option(preset, 'quality').get(
+        output_format, DEFAULT_OPTIONS['quality'][output_format])
+
+
+def get_render_family(preset):
+    """Return the presets of the family rendered with the preset.
+
+    They are the presets of the family (see get_family) with the same decode
+    mode (the draft option), which share a single decode of the source.
+    """
+    draft = get_option(preset, 'draft')
+    return [name for name in get_family(preset)
+            if get_option(name, 'draft') == draft]
@@ -0,0 +1,186 @@
+"""Module with the functions used to render the thumbnails."""
+import math
+from io import BytesIO
+
+from PIL import Image, ImageOps, features
+
+from .limits import ImageTooLarge, check_pixels
+
+
+# The output formats. Each one has the Pillow format, the content type, the
+# file extension and the encoder options (the quality is set by the presets).
+ENCODERS = {
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg',
+             {'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', 'image/webp', 'webp', {'method': 4}),
+    'avif': ('AVIF', 'image/avif', 'avif', {'speed': 6}),
+}
+
+DEFAULT_FORMAT = 'jpeg'
+
+# In the fast decode mode the image is reduced to no less than DRAFT_GAP times
+# the size needed by the thumbnails, so the final resample still has enough
+# pixels to keep the quality.
+DRAFT_GAP = 2.0
+
+
+def is_supported(output_format):
+    """Return True if the Pillow installation can encode the format."""
+    image_format = ENCODERS[output_format][0]
+    Image.init()
+    if image_format not in Image.SAVE:
+        return False
+    if output_format in features.modules:
+        return features.check_module(output_format)
+    return True
+
+
+SUPPORTED_FORMATS = [name for name in ENCODERS if is_supported(name)]
+
+
+def negotiate(accept):
+    """Return the best output format accepted by the client.
+
+    The formats other than JPEG are only used when the Accept header lists
+    them explicitly (browsers send image/webp and image/avif when they
+    support them), otherwise the JPEG is the fallback.
+    """
+    accepted = {}
+    for media_range in accept.split(','):
+        media_type, *params = media_range.strip().split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[media_type.strip().lower()] = quality
+
+    for output_format in ('avif', 'webp'):
+        content_type = ENCODERS[output_format][1]
+        if output_format in SUPPORTED_FORMATS and \
+                accepted.get(content_type, 0) > 0:
+            return output_format
+    return DEFAULT_FORMAT
+
+
+def signature(output_format, quality):
+    """Return a string identifying the encoder settings.
+
+    It is part of the derivative key (and the ETag), so changing the settings
+    makes the clients fetch the new thumbnails.
+    """
+    image_format, _, _, options = ENCODERS[output_format]
+    options = dict(options, quality=quality)
+    return f'{image_format}:' + ','.join(
+        f'{name}={value}' for name, value in sorted(options.items()))
+
+
+def encode(image, output_format, quality):
+    """Encode the image in the output format and return its bytes."""
+    image_format, _, _, options = ENCODERS[output_format]
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    output = BytesIO()
+    image.save(output, image_format, quality=quality, **options)
+    return output.getvalue()
+
+
+def group_by_aspect(sizes):
+    """Group the sizes with the same aspect ratio, largest first.
+
+    The sizes parameter is a dict of names and (width, height) tuples. The
+    return is a list of groups, each one a list of (name, size) tuples.
+    """
+    groups = []
+    for name, size in sorted(sizes.items(), key=lambda item: -item[1][0]):
+        width, height = size
+        for group in groups:
+            group_width, group_height = group[0][1]
+            if width * group_height == height * group_width:
+                group.append((name, size))
+                break
+        else:
+            groups.append([(name, size)])
+    return groups
+
+
+def cover_size(image_size, sizes):
+    """Return the smallest scale of the image that covers all the sizes.
+
+    Each size is cropped from the image by ImageOps.fit, so the scaled image
+    must be at least as wide and as tall as every size.
+    """
+    width, height = image_size
+    scale = max(max(size[0] / width, size[1] / height) for size in sizes)
+    return width * scale, height * scale
+
+
+def reduce(image, sizes):
+    """Decode the image at the smallest scale that covers the sizes.
+
+    For JPEG images the draft mode makes the decoder use the DCT scaling
+    (1/2, 1/4 or 1/8), which avoids decoding all the pixels of large
+    originals. Then Image.reduce shrinks the result by an integer factor,
+    which is much cheaper than the final high quality resample.
+    """
+    cover_width, cover_height = cover_size(image.size, sizes)
+    target = (math.ceil(cover_width * DRAFT_GAP),
+              math.ceil(cover_height * DRAFT_GAP))
+
+    image.draft(None, target)
+    factor = int(min(image.width / target[0], image.height / target[1]))
+    if factor > 1:
+        return image.reduce(factor)
+    return image
+
+
+def fit_presets(image_file, sizes, draft=False, limit=True):
+    """Yield the names and the images of the sizes from a single decode.
+
+    The sizes parameter is a dict of names and (width, height) tuples. Each
+    size is cropped to be in its aspect ratio. Within the sizes of the same
+    aspect ratio the largest is rendered first and the smaller ones are
+    derived from it, so the original is only resampled once per ratio.
+
+    When draft is True the image is decoded in the fast mode (see reduce).
+    When limit is True the images with more pixels than THUMBNAIL_MAX_PIXELS
+    raise ImageTooLarge before being decoded. The images are only valid
+    until the next one is yielded.
+    """
+    try:
+        original = Image.open(image_file)
+    except Image.DecompressionBombError as error:
+        raise ImageTooLarge(str(error)) from error
+
+    with original:
+        # Only the header has been read so far.
+        if limit:
+            check_pixels(original.size)
+        image = reduce(original, sizes.values()) if draft else original
+        for group in group_by_aspect(sizes):
+            source = image
+            for name, size in group:
+                source = ImageOps.fit(source, size, method=Image.LANCZOS,
+                                      centering=(0.5, 0.5))
+                yield name, source
+
+
+def render_presets(image_file, sizes, output_format=DEFAULT_FORMAT,
+                   quality=None, draft=False, limit=True):
+    """Render the image file in many sizes from a single decode.
+
+    See fit_presets for the sizes, draft and limit parameters. The quality
+    parameter is a dict with the encoder quality of each name (80 when
+    missing).
+
+    The return is a dict with the names and the bytes of the encoded images.
+    """
+    quality = quality or {}
+    return {
+        name: encode(image, output_format, quality.get(name, 80))
+        for name, image in fit_presets(image_file, sizes, draft, limit)
+    }
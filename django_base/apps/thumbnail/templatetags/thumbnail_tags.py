@@ -1,15 +1,76 @@
 """Module with the template tags used by the thumbnail application."""
 import os
+import re
+from functools import lru_cache
 
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.template import Library
-from django.urls import reverse
+from django.urls import get_script_prefix, reverse
+from django.utils.html import format_html
+
+from ..presets import PRESET_CHOICES, get_family
 
 
 register = Library()
 
+# Names that reverse() would return unchanged (no percent-encoding needed).
+SIMPLE_NAME = re.compile(r'[A-Za-z0-9_.-]+')
+
+PLACEHOLDER = 'thumbnail-placeholder'
+
+
+@lru_cache(maxsize=None)
+def _url_template(script_prefix):
+    """Return the URL of the generator view with a placeholder as the path.
+
+    The script prefix is part of the cache key because reverse() uses it.
+    """
+    # pylint: disable=unused-argument
+    return reverse('thumbnail:generator', args=(PLACEHOLDER,))
+
+
+@receiver(setting_changed)
+def _clear_url_template(setting, **kwargs):
+    """Clear the cached URL when the URL configuration changes (tests)."""
+    # pylint: disable=unused-argument
+    if setting == 'ROOT_URLCONF':
+        _url_template.cache_clear()
+
+
+def build_url(path, preset):
+    """Return the URL of the thumbnail of the image path in the preset.
+
+    The URL is resolved once and the image name is put in its place, so a
+    grid with many images doesn't resolve the URL of each one.
+    """
+    name = os.path.basename(path)
+    if SIMPLE_NAME.fullmatch(name):
+        url = _url_template(get_script_prefix()).replace(PLACEHOLDER, name)
+    else:
+        url = reverse('thumbnail:generator', args=(name,))
+    return f'{url}?preset={preset}'
+
 
 @register.simple_tag
 def thumbnail_url(path, profile):
-    path = os.path.basename(path)
-    url = reverse('thumbnail:generator', args=(path,))
-    return f'{url}?preset={profile}'
\ No newline at end of file
+    """Return the URL of the thumbnail of the image in the preset (profile)."""
+    return build_url(path, profile)
+
+
+@register.simple_tag
+def thumbnail_srcset(path, preset, sizes=None):
+    """Return the srcset and sizes attributes of the preset family.
+
+    The srcset lists the presets in the aspect ratio of the preset (e.g.
+    poster_squared and poster_squared_2x) with their widths. The sizes
+    defaults to the width of the preset.
+
+    Usage: <img src="{% thumbnail_url path 'poster_squared' %}"
+                {% thumbnail_srcset path 'poster_squared' %}>
+    """
+    family = sorted(get_family(preset), key=lambda name: PRESET_CHOICES[name])
+    srcset = ', '.join(f'{build_url(path, name)} {PRESET_CHOICES[name][0]}w'
+                       for name in family)
+    sizes = sizes or f'{PRESET_CHOICES[preset][0]}px'
+    return format_html('srcset="{}" sizes="{}"', srcset, sizes)
@@ -0,0 +1,75 @@
+"""Module with the integration test cases of the Async Generator View."""
+import os
+import shutil
+import asyncio
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import AsyncRequestFactory, TestCase, override_settings, tag
+
+from django_base.apps.thumbnail.presets import PRESET_CHOICES, POSTER_PORTRAIT
+from django_base.apps.thumbnail.views.generator import AsyncGeneratorView
+
+
+@tag('integration')
+class AsyncGeneratorViewTest(TestCase):
+    """Integration test case of the async thumbnail generator view."""
+
+    def setUp(self):
+        """Set up a temporary media root with a source image."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        output = BytesIO()
+        Image.new('RGB', (800, 600), 'red').save(output, 'JPEG')
+        default_storage.save(os.path.join(settings.PHOTO_DIR, 'poster.jpg'),
+                             ContentFile(output.getvalue()))
+        self.factory = AsyncRequestFactory()
+        self.view = AsyncGeneratorView.as_view()
+
+    def tearDown(self):
+        """Remove the temporary media root."""
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_view_is_coroutine_function(self):
+        """Test Django sees the view as async (no sync_to_async wrapping)."""
+        self.assertTrue(asyncio.iscoroutinefunction(self.view))
+
+    async def test_get_renders_preset_size(self):
+        """Test the thumbnail is rendered in the size of the preset."""
+        request = self.factory.get(f'/?preset={POSTER_PORTRAIT}')
+        response = await self.view(request, path='poster.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        with Image.open(BytesIO(response.content)) as image:
+            self.assertEqual(image.size, PRESET_CHOICES[POSTER_PORTRAIT])
+
+    async def test_concurrent_requests(self):
+        """Test many requests in flight get the same thumbnail."""
+        requests = [self.factory.get(f'/?preset={POSTER_PORTRAIT}')
+                    for _ in range(4)]
+        responses = await asyncio.gather(
+            *(self.view(request, path='poster.jpg') for request in requests))
+        self.assertEqual({response.content for response in responses},
+                         {responses[0].content})
+
+    async def test_get_not_found(self):
+        """Test the response when the source image doesn't exist."""
+        response = await self.view(self.factory.get('/'), path='missing.jpg')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_options(self):
+        """Test the OPTIONS requests are answered by the async view."""
+        response = await self.view(self.factory.options('/'), path='poster.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('GET', response['Allow'])
+
+    async def test_method_not_allowed(self):
+        """Test the requests of other methods are answered with a 405."""
+        response = await self.view(self.factory.post('/'), path='poster.jpg')
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,160 @@
+"""Module with the integration test cases of the Generator View."""
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+from django.conf import settings
+from django.urls import reverse
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, Client, override_settings, tag
+
+from django_base.apps.thumbnail.presets import (
+    PRESET_CHOICES,
+    POSTER_SQUARED,
+    POSTER_PORTRAIT,
+    POSTER_PORTRAIT_2X,
+    get_option
+)
+from django_base.apps.thumbnail.derivatives import source_metadata
+from django_base.apps.thumbnail.limits import RenderBusy
+from django_base.apps.thumbnail.views.generator import GeneratorView
+
+
+def make_image(size=(800, 600), color='red'):
+    """Return the bytes of a JPEG image used as source in the tests."""
+    output = BytesIO()
+    Image.new('RGB', size, color).save(output, 'JPEG')
+    return output.getvalue()
+
+
+# pylint: disable=invalid-name
+@tag('integration')
+class GeneratorViewTest(TestCase):
+    """Integration test case of the thumbnail generator view."""
+
+    def setUp(self):
+        """Set up a temporary media root with a source image."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        default_storage.save(os.path.join(settings.PHOTO_DIR, 'poster.jpg'),
+                             ContentFile(make_image()))
+        self.client = Client()
+
+    def tearDown(self):
+        """Remove the temporary media root."""
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_get_renders_preset_size(self):
+        """Test the thumbnail is rendered in the size of the preset."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        response = self.client.get(endpoint, {'preset': POSTER_PORTRAIT})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        with Image.open(BytesIO(response.content)) as image:
+            self.assertEqual(image.size, PRESET_CHOICES[POSTER_PORTRAIT])
+
+    def test_get_not_found(self):
+        """Test the response when the source image doesn't exist."""
+        endpoint = reverse('thumbnail:generator', args=('missing.jpg',))
+        response = self.client.get(endpoint)
+        self.assertEqual(response.status_code, 404)
+
+    def test_second_request_uses_derivative(self):
+        """Test the image is rendered only once and served from the store."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        first = self.client.get(endpoint)
+        with mock.patch('django_base.apps.thumbnail.derivatives.'
+                        'fit_presets') as fit_presets:
+            second = self.client.get(endpoint)
+        fit_presets.assert_not_called()
+        self.assertEqual(first.content, second.content)
+        self.assertTrue(os.path.isdir(
+            os.path.join(self.media_root, GeneratorView.store.location)))
+
+    def test_get_renders_family(self):
+        """Test the presets in the same aspect ratio are rendered together."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        self.client.get(endpoint, {'preset': POSTER_PORTRAIT})
+        source = os.path.join(settings.PHOTO_DIR, 'poster.jpg')
+        version, _ = source_metadata(source)
+        self.assertTrue(GeneratorView.store.exists(source, POSTER_PORTRAIT_2X,
+                                                   version))
+        self.assertFalse(GeneratorView.store.exists(source, POSTER_SQUARED,
+                                                    version))
+
+    def test_get_sets_validators_and_cache_control(self):
+        """Test the response has the ETag, Last-Modified and Cache-Control."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        response = self.client.get(endpoint, {'preset': POSTER_PORTRAIT})
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn(f'max-age={get_option(POSTER_PORTRAIT, "max_age")}',
+                      response['Cache-Control'])
+
+    def test_if_none_match_not_modified(self):
+        """Test the revalidation with If-None-Match doesn't open the image."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        etag = self.client.get(endpoint)['ETag']
+        with mock.patch.object(default_storage, 'open') as storage_open:
+            response = self.client.get(endpoint, HTTP_IF_NONE_MATCH=etag)
+        storage_open.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_modified_since_not_modified(self):
+        """Test the revalidation with If-Modified-Since."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        last_modified = self.client.get(endpoint)['Last-Modified']
+        response = self.client.get(endpoint,
+                                   HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_depends_on_preset(self):
+        """Test the ETag of different presets of the same image differ."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        etag = self.client.get(endpoint)['ETag']
+        response = self.client.get(endpoint, {'preset': POSTER_PORTRAIT},
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_accept_webp(self):
+        """Test the WebP is served to the clients that accept it."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        jpeg = self.client.get(endpoint)
+        response = self.client.get(endpoint, HTTP_ACCEPT='image/webp,*/*')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('Accept', response['Vary'])
+        self.assertNotEqual(response['ETag'], jpeg['ETag'])
+        with Image.open(BytesIO(response.content)) as image:
+            self.assertEqual(image.format, 'WEBP')
+
+    def test_accept_fallback_jpeg(self):
+        """Test the JPEG is served when no other format is accepted."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        response = self.client.get(endpoint, HTTP_ACCEPT='*/*')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('Accept', response['Vary'])
+
+    @override_settings(THUMBNAIL_MAX_PIXELS=1000)
+    def test_image_too_large(self):
+        """Test the sources exceeding the limits get an error response."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        response = self.client.get(endpoint)
+        self.assertEqual(response.status_code, 422)
+
+    def test_render_busy(self):
+        """Test the response when the worker has no render slot."""
+        endpoint = reverse('thumbnail:generator', args=('poster.jpg',))
+        with mock.patch('django_base.apps.thumbnail.derivatives.render_slot',
+                        side_effect=RenderBusy):
+            response = self.client.get(endpoint)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
@@ -0,0 +1,93 @@
+"""Module with the integration test cases of pregenerate_thumbnails."""
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from PIL import Image
+from django.conf import settings
+from django.core.management import call_command
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings, tag
+
+from django_base.apps.thumbnail.presets import PRESET_CHOICES, POSTER_SQUARED
+from django_base.apps.thumbnail.renderer import SUPPORTED_FORMATS
+from django_base.apps.thumbnail.derivatives import DerivativeStore, source_metadata
+
+
+@tag('integration')
+class PregenerateThumbnailsTest(TestCase):
+    """Integration test case of the pregenerate_thumbnails command."""
+
+    def setUp(self):
+        """Set up a temporary media root with two source images."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.sources = [os.path.join(settings.PHOTO_DIR, 'a.jpg'),
+                        os.path.join(settings.PHOTO_DIR, 'sub', 'b.jpg')]
+        for source in self.sources:
+            output = BytesIO()
+            Image.new('RGB', (600, 400), 'blue').save(output, 'JPEG')
+            default_storage.save(source, ContentFile(output.getvalue()))
+
+    def tearDown(self):
+        """Remove the temporary media root."""
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_renders_all_presets(self):
+        """Test every preset of every image in PHOTO_DIR is rendered."""
+        out = StringIO()
+        call_command('pregenerate_thumbnails', processes=1, formats=['jpeg'],
+                     stdout=out)
+        store = DerivativeStore()
+        for source in self.sources:
+            version, _ = source_metadata(source)
+            for preset in PRESET_CHOICES:
+                self.assertTrue(store.exists(source, preset, version))
+        self.assertIn(f'2 images ({len(PRESET_CHOICES) * 2} thumbnails '
+                      'rendered, 0 skipped', out.getvalue())
+        self.assertIn('images/sec', out.getvalue())
+
+    def test_incremental(self):
+        """Test a second run skips the thumbnails already rendered."""
+        call_command('pregenerate_thumbnails', processes=1, formats=['jpeg'],
+                     stdout=StringIO())
+        out = StringIO()
+        call_command('pregenerate_thumbnails', self.sources[0], processes=1,
+                     formats=['jpeg'], stdout=out)
+        self.assertIn(f'1 images (0 thumbnails rendered, '
+                      f'{len(PRESET_CHOICES)} skipped', out.getvalue())
+
+    def test_lists_rendered_derivatives(self):
+        """Test the rendered derivatives are listed once, not checked one by
+        one."""
+        out = StringIO()
+        # The workers are forked with the patch, a call fails the source.
+        with mock.patch.object(DerivativeStore, 'exists',
+                               side_effect=AssertionError('exists called')):
+            call_command('pregenerate_thumbnails', processes=1,
+                         formats=['jpeg'], stdout=out)
+        self.assertIn(f'{len(PRESET_CHOICES) * 2} thumbnails rendered, '
+                      f'0 skipped, 0 failed', out.getvalue())
+
+    def test_renders_all_formats(self):
+        """Test the presets are rendered in every supported format."""
+        out = StringIO()
+        call_command('pregenerate_thumbnails', self.sources[0], processes=1,
+                     stdout=out)
+        store = DerivativeStore()
+        version, _ = source_metadata(self.sources[0])
+        for output_format in SUPPORTED_FORMATS:
+            self.assertTrue(store.exists(self.sources[0], POSTER_SQUARED,
+                                         version, output_format))
+
+    def test_missing_photo_dir(self):
+        """Test a missing PHOTO_DIR is a warning, not an error."""
+        shutil.rmtree(os.path.join(self.media_root, settings.PHOTO_DIR))
+        err = StringIO()
+        call_command('pregenerate_thumbnails', processes=1, stderr=err)
+        self.assertIn('not found', err.getvalue())
@@ -0,0 +1,109 @@
+"""Module with the unit test cases of the derivative store."""
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+from django.test import SimpleTestCase, tag
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from django_base.apps.thumbnail import derivatives, presets
+from django_base.apps.thumbnail.derivatives import DerivativeStore, source_metadata
+
+
+@tag('unit')
+class DerivativeStoreTest(SimpleTestCase):
+    """Unit test case of the DerivativeStore class."""
+
+    def setUp(self):
+        """Set up a store in a temporary directory."""
+        self.location = tempfile.mkdtemp()
+        self.storage = FileSystemStorage(location=self.location)
+        self.store = DerivativeStore(self.storage, 'thumbnails')
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.location)
+
+    def test_path_fan_out(self):
+        """Test the derivative path is spread in hashed directories."""
+        key = self.store.key('photos/a.jpg', 'poster_squared', '1-2')
+        path = self.store.path('photos/a.jpg', 'poster_squared', '1-2')
+        self.assertEqual(path, f'thumbnails/{key[:2]}/{key[2:4]}/{key}.jpg')
+
+    def test_key_depends_on_version(self):
+        """Test a new version of the source produces another key."""
+        self.assertNotEqual(
+            self.store.key('photos/a.jpg', 'poster_squared', '1-2'),
+            self.store.key('photos/a.jpg', 'poster_squared', '1-3'))
+
+    def test_get_missing(self):
+        """Test the store returns None for derivatives not rendered yet."""
+        self.assertIsNone(self.store.get('photos/a.jpg', 'poster_squared', '1'))
+
+    def test_save_and_get(self):
+        """Test a saved derivative is returned by the store."""
+        self.store.save('photos/a.jpg', 'poster_squared', '1', b'data')
+        self.assertEqual(
+            self.store.get('photos/a.jpg', 'poster_squared', '1'), b'data')
+
+    def test_save_twice_keeps_one_file(self):
+        """Test saving the same derivative again doesn't leave copies."""
+        self.store.save('photos/a.jpg', 'poster_squared', '1', b'data')
+        self.store.save('photos/a.jpg', 'poster_squared', '1', b'data')
+        path = self.store.path('photos/a.jpg', 'poster_squared', '1')
+        _, files = self.storage.listdir(path.rsplit('/', 1)[0])
+        self.assertEqual(len(files), 1)
+
+    def test_source_version_changes(self):
+        """Test the version changes when the source is replaced."""
+        self.storage.save('a.jpg', ContentFile(b'one'))
+        version = source_metadata('a.jpg', self.storage)[0]
+        self.storage.delete('a.jpg')
+        self.storage.save('a.jpg', ContentFile(b'other'))
+        self.assertNotEqual(version, source_metadata('a.jpg', self.storage)[0])
+
+    def test_render_groups_by_draft(self):
+        """Test the presets are rendered with their own decode mode."""
+        output = BytesIO()
+        Image.new('RGB', (600, 600), 'blue').save(output, 'JPEG')
+        self.storage.save('a.jpg', ContentFile(output.getvalue()))
+        options = {'poster_squared': {'draft': False}}
+        with mock.patch.dict(presets.PRESET_OPTIONS, options), \
+                mock.patch.object(derivatives, 'fit_presets',
+                                  wraps=derivatives.fit_presets) as fit:
+            self.assertEqual(presets.get_render_family('poster_squared'),
+                             ['poster_squared'])
+            self.store.render('a.jpg', '1', ['poster_squared',
+                                             'poster_squared_2x'],
+                              source_storage=self.storage)
+        drafts = {tuple(call[0][1]): call[0][2] for call in fit.call_args_list}
+        self.assertEqual(drafts, {('poster_squared',): False,
+                                  ('poster_squared_2x',): True})
+
+    def test_render_formats_single_decode(self):
+        """Test all the formats are encoded from a single decode."""
+        output = BytesIO()
+        Image.new('RGB', (600, 600), 'blue').save(output, 'JPEG')
+        self.storage.save('a.jpg', ContentFile(output.getvalue()))
+        with mock.patch.object(derivatives, 'fit_presets',
+                               wraps=derivatives.fit_presets) as fit:
+            results = self.store.render_formats(
+                'a.jpg', '1', {'jpeg': ['poster_squared', 'poster_squared_2x'],
+                               'webp': ['poster_squared']},
+                source_storage=self.storage)
+        self.assertEqual(fit.call_count, 1)
+        self.assertEqual(sorted(results['jpeg']),
+                         ['poster_squared', 'poster_squared_2x'])
+        self.assertEqual(list(results['webp']), ['poster_squared'])
+        self.assertTrue(self.store.exists('a.jpg', 'poster_squared', '1', 'webp'))
+
+    def test_partial_quality_override(self):
+        """Test the formats a preset doesn't list use the default quality."""
+        options = {'poster_squared': {'quality': {'jpeg': 90}}}
+        with mock.patch.dict(presets.PRESET_OPTIONS, options):
+            self.assertEqual(presets.get_quality('poster_squared', 'jpeg'), 90)
+            self.assertEqual(presets.get_quality('poster_squared', 'avif'), 60)
+            self.store.key('photos/a.jpg', 'poster_squared', '1', 'webp')
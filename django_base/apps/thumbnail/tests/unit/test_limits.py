@@ -0,0 +1,65 @@
+"""Module with the unit test cases of the render limits."""
+import threading
+from io import BytesIO
+
+from PIL import Image
+from django.test import SimpleTestCase, override_settings, tag
+
+from django_base.apps.thumbnail import limits
+from django_base.apps.thumbnail.renderer import render_presets
+from django_base.apps.thumbnail.limits import (
+    ImageTooLarge,
+    RenderBusy,
+    check_file_size,
+    render_slot
+)
+
+
+@tag('unit')
+class LimitsTest(SimpleTestCase):
+    """Unit test case of the limits module."""
+
+    def tearDown(self):
+        """Reset the semaphore, so the next test reads the settings again."""
+        limits._semaphore = None  # pylint: disable=protected-access
+
+    @override_settings(THUMBNAIL_MAX_FILE_SIZE=100)
+    def test_check_file_size(self):
+        """Test the files larger than the limit are refused."""
+        check_file_size(100)
+        with self.assertRaises(ImageTooLarge):
+            check_file_size(101)
+
+    @override_settings(THUMBNAIL_MAX_PIXELS=1000 * 1000)
+    def test_render_presets_max_pixels(self):
+        """Test the images with too many pixels are refused."""
+        output = BytesIO()
+        Image.new('RGB', (1001, 1000)).save(output, 'JPEG')
+        output.seek(0)
+        with self.assertRaises(ImageTooLarge):
+            render_presets(output, {'a': (240, 240)})
+
+    @override_settings(THUMBNAIL_MAX_RENDERS=1, THUMBNAIL_RENDER_WAIT=0)
+    def test_render_slot_busy(self):
+        """Test RenderBusy is raised when all the slots are in use."""
+        holding = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with render_slot():
+                holding.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        holding.wait()
+        try:
+            with self.assertRaises(RenderBusy):
+                with render_slot():
+                    pass
+        finally:
+            release.set()
+            thread.join()
+
+        with render_slot():
+            pass
@@ -0,0 +1,116 @@
+"""Module with the unit test cases of the render locks."""
+import os
+import time
+import asyncio
+import shutil
+import tempfile
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings, tag
+
+from django_base.apps.thumbnail.locks import (FileLock, asingle_flight,
+                                              get_lock, single_flight)
+
+
+@tag('unit')
+class SingleFlightTest(SimpleTestCase):
+    """Unit test case of the single_flight function."""
+
+    def setUp(self):
+        """Set up a temporary directory for the lock files."""
+        self.lock_dir = tempfile.mkdtemp()
+        cache.clear()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.lock_dir)
+
+    def run_concurrently(self, num_threads=5):
+        """Call single_flight in many threads and return the calls/results."""
+        calls = []
+        store = {}
+        results = []
+
+        def render():
+            calls.append(1)
+            time.sleep(0.2)
+            store['result'] = 'content'
+            return 'content'
+
+        def target():
+            results.append(single_flight('photo:1:jpeg', render,
+                                         lambda: store.get('result')))
+
+        threads = [threading.Thread(target=target) for _ in range(num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return calls, results
+
+    def test_cache_lock_renders_once(self):
+        """Test the concurrent callers reuse the result of the first one."""
+        with override_settings(THUMBNAIL_LOCK='cache'):
+            calls, results = self.run_concurrently()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['content'] * 5)
+
+    def test_file_lock_renders_once(self):
+        """Test the file lock also coalesces the concurrent renders."""
+        with override_settings(THUMBNAIL_LOCK='file',
+                               THUMBNAIL_LOCK_DIR=self.lock_dir):
+            calls, results = self.run_concurrently()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['content'] * 5)
+
+    def test_wait_timeout_fallback(self):
+        """Test the caller renders itself after waiting for the timeout."""
+        lock = get_lock('photo:2:jpeg')
+        self.assertTrue(lock.acquire())
+        try:
+            result = single_flight('photo:2:jpeg', lambda: 'own', lambda: None,
+                                   wait=0.1)
+        finally:
+            lock.release()
+        self.assertEqual(result, 'own')
+
+    async def test_async_renders_once(self):
+        """Test the async callers wait for the render on the event loop."""
+        calls = []
+        store = {}
+
+        async def render():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            store['result'] = 'content'
+            return 'content'
+
+        async def fetch():
+            return store.get('result')
+
+        results = await asyncio.gather(*(
+            asingle_flight('photo:3:jpeg', render, fetch) for _ in range(5)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['content'] * 5)
+
+    def test_file_lock_stale(self):
+        """Test the lock file left by a dead process is taken over."""
+        # A file without a holder, like the one of a killed process.
+        open(os.path.join(self.lock_dir, 'key.lock'), 'w').close()
+        lock = FileLock('key', timeout=60, directory=self.lock_dir)
+        self.assertFalse(lock.locked())
+        self.assertTrue(lock.acquire())
+        self.assertTrue(lock.locked())
+        lock.release()
+        self.assertFalse(lock.locked())
+
+    def test_file_lock_held(self):
+        """Test a held lock isn't taken over, whatever its age."""
+        first = FileLock('key', timeout=0, directory=self.lock_dir)
+        second = FileLock('key', timeout=0, directory=self.lock_dir)
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        first.release()
+        self.assertTrue(second.acquire())
+        second.release()
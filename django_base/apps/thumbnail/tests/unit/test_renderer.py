@@ -0,0 +1,93 @@
+"""Module with the unit test cases of the renderer module."""
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image, ImageOps
+from django.test import SimpleTestCase, tag
+
+from django_base.apps.thumbnail.renderer import (
+    DRAFT_GAP,
+    SUPPORTED_FORMATS,
+    group_by_aspect,
+    negotiate,
+    reduce,
+    render_presets
+)
+
+
+def make_image(size=(1000, 800)):
+    """Return a file-like object with a JPEG image."""
+    output = BytesIO()
+    Image.new('RGB', size, 'green').save(output, 'JPEG')
+    output.seek(0)
+    return output
+
+
+@tag('unit')
+class RendererTest(SimpleTestCase):
+    """Unit test case of the renderer functions."""
+
+    def test_group_by_aspect(self):
+        """Test the sizes are grouped by aspect ratio, largest first."""
+        groups = group_by_aspect({
+            'a': (240, 240), 'b': (480, 480), 'c': (240, 360), 'd': (480, 720)
+        })
+        self.assertEqual(groups, [
+            [('b', (480, 480)), ('a', (240, 240))],
+            [('d', (480, 720)), ('c', (240, 360))],
+        ])
+
+    def test_render_presets_sizes(self):
+        """Test every size is rendered in its dimensions."""
+        sizes = {'a': (240, 240), 'b': (480, 480), 'c': (720, 480)}
+        results = render_presets(make_image(), sizes)
+        for name, size in sizes.items():
+            with Image.open(BytesIO(results[name])) as image:
+                self.assertEqual(image.size, size)
+                self.assertEqual(image.format, 'JPEG')
+
+    def test_render_presets_single_decode(self):
+        """Test the smaller sizes are derived from the larger intermediate."""
+        with mock.patch('django_base.apps.thumbnail.renderer.ImageOps.fit',
+                        wraps=ImageOps.fit) as fit:
+            render_presets(make_image(), {'a': (240, 240), 'b': (480, 480)})
+        self.assertEqual(fit.call_args_list[0][0][1], (480, 480))
+        self.assertEqual(fit.call_args_list[1][0][0].size, (480, 480))
+
+    def test_reduce_covers_sizes(self):
+        """Test the fast decode is smaller but still covers the sizes."""
+        with Image.open(make_image((4000, 3000))) as image:
+            reduced = reduce(image, [(240, 360)])
+            self.assertLess(reduced.width, 4000)
+            self.assertGreaterEqual(reduced.height, 360 * DRAFT_GAP)
+            self.assertGreaterEqual(reduced.width, 240 * DRAFT_GAP)
+
+    def test_reduce_small_image(self):
+        """Test images smaller than the sizes are kept as they are."""
+        with Image.open(make_image((300, 300))) as image:
+            self.assertEqual(reduce(image, [(240, 240)]).size, (300, 300))
+
+    def test_render_presets_draft_sizes(self):
+        """Test the fast decode renders the sizes in their dimensions."""
+        sizes = {'a': (240, 360), 'b': (720, 480)}
+        results = render_presets(make_image((4000, 3000)), sizes, draft=True)
+        for name, size in sizes.items():
+            with Image.open(BytesIO(results[name])) as image:
+                self.assertEqual(image.size, size)
+
+    def test_negotiate(self):
+        """Test the output format negotiated from the Accept header."""
+        self.assertEqual(negotiate(''), 'jpeg')
+        self.assertEqual(negotiate('*/*'), 'jpeg')
+        self.assertEqual(negotiate('image/webp;q=0, */*'), 'jpeg')
+        if 'webp' in SUPPORTED_FORMATS:
+            self.assertEqual(negotiate('image/webp,*/*;q=0.8'), 'webp')
+        if 'avif' in SUPPORTED_FORMATS:
+            self.assertEqual(negotiate('image/avif,image/webp,*/*'), 'avif')
+
+    def test_render_presets_format(self):
+        """Test the sizes are encoded in the output format."""
+        results = render_presets(make_image(), {'a': (240, 240)}, 'webp',
+                                 {'a': 70})
+        with Image.open(BytesIO(results['a'])) as image:
+            self.assertEqual(image.format, 'WEBP')
@@ -0,0 +1,47 @@
+"""Module with the unit test cases of the thumbnail template tags."""
+from django.urls import reverse
+from django.template import Context, Template
+from django.test import SimpleTestCase, tag
+
+from django_base.apps.thumbnail.templatetags.thumbnail_tags import (
+    build_url,
+    thumbnail_srcset
+)
+
+
+@tag('unit')
+class ThumbnailTagsTest(SimpleTestCase):
+    """Unit test case of the thumbnail template tags."""
+
+    def test_build_url_matches_reverse(self):
+        """Test the cached URL is the same returned by reverse."""
+        url = reverse('thumbnail:generator', args=('poster-1.jpg',))
+        self.assertEqual(build_url('photos/poster-1.jpg', 'poster_squared'),
+                         f'{url}?preset=poster_squared')
+
+    def test_build_url_non_ascii(self):
+        """Test the names that need encoding fall back to reverse."""
+        url = reverse('thumbnail:generator', args=('pôster.jpg',))
+        self.assertEqual(build_url('pôster.jpg', 'poster_squared'),
+                         f'{url}?preset=poster_squared')
+
+    def test_thumbnail_url_tag(self):
+        """Test the thumbnail_url tag in a template."""
+        template = Template('{% load thumbnail_tags %}'
+                            '{% thumbnail_url path "poster_portrait" %}')
+        result = template.render(Context({'path': 'photos/a.jpg'}))
+        self.assertEqual(result, build_url('a.jpg', 'poster_portrait'))
+
+    def test_thumbnail_srcset(self):
+        """Test the srcset lists the family of the preset."""
+        result = thumbnail_srcset('photos/a.jpg', 'poster_squared')
+        url_1x = build_url('a.jpg', 'poster_squared')
+        url_2x = build_url('a.jpg', 'poster_squared_2x')
+        self.assertEqual(
+            result, f'srcset="{url_1x} 240w, {url_2x} 480w" sizes="240px"')
+
+    def test_thumbnail_srcset_sizes(self):
+        """Test the sizes attribute can be given."""
+        result = thumbnail_srcset('a.jpg', 'poster_portrait',
+                                  '(max-width: 600px) 50vw, 240px')
+        self.assertIn('sizes="(max-width: 600px) 50vw, 240px"', result)
@@ -1,11 +1,15 @@
 """URL routes of the thumbnail application."""
+from django.conf import settings
 from django.urls import re_path
 
-from .views.generator import GeneratorView
+from .views.generator import AsyncGeneratorView, GeneratorView
 
 
 app_name = 'thumbnail'
 
+# The async view keeps many renders in flight under ASGI.
+generator_view = AsyncGeneratorView if settings.THUMBNAIL_ASYNC else GeneratorView
+
 urlpatterns = [
-    re_path(r'(?P<path>[\w.-]+)$', GeneratorView.as_view(), name='generator'),
+    re_path(r'(?P<path>[\w.-]+)$', generator_view.as_view(), name='generator'),
 ]
\ No newline at end of file
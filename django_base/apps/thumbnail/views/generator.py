@@ -1,34 +1,234 @@
 """Module with view classes used in the thumbnail system."""
 import os
-from PIL import Image, ImageOps
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
 
 from django.conf import settings
 from django.http import HttpResponse, HttpResponseNotFound
 from django.views.generic import View
+from django.utils.decorators import classonlymethod
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag
 from django.core.files.storage import default_storage
 
-from ..presets import PRESET_CHOICES, POSTER_SQUARED
+from ..presets import (PRESET_CHOICES, POSTER_SQUARED, get_option,
+                       get_render_family)
+from ..renderer import ENCODERS, negotiate
+from ..derivatives import DerivativeStore, source_metadata
+from ..locks import asingle_flight, single_flight
+from ..limits import ImageTooLarge, RenderBusy
+
+try:
+    from asgiref.sync import markcoroutinefunction
+except ImportError:  # asgiref < 3.6
+    markcoroutinefunction = None
 
 
 class GeneratorView(View):
     """The Generator view class."""
 
+    store = DerivativeStore()
+
     def get(self, request, path):
         """Handle the HTTP GET requests."""
         preset = request.GET.get('preset')
-        return self.fit(os.path.join(settings.PHOTO_DIR, path), preset)
-
-    def fit(self, image_url, preset):
-        """Crops the image to be in the right aspect ratio."""
-        preset_size = PRESET_CHOICES.get(preset, PRESET_CHOICES[POSTER_SQUARED])
-
-        if default_storage.exists(image_url):
-            response = HttpResponse(content_type='image/jpeg')
-            with default_storage.open(image_url) as image_file:
-                with Image.open(image_file) as image:
-                    result = ImageOps.fit(image, preset_size, centering=(0.5, 0.5))
-                    # image.thumbnail(preset_size, Image.ANTIALIAS)
-                    # image.save(response, 'JPEG', quality=80, optimize=True, progressive=True)
-                    result.save(response, 'JPEG', quality=80, optimize=True, progressive=True)
+        return self.fit(request, os.path.join(settings.PHOTO_DIR, path), preset)
+
+    def fit(self, request, image_url, preset):
+        """Crops the image to be in the right aspect ratio.
+
+        The rendered image is kept in the derivative store, so only the first
+        request of each source version pays the decode, resize and encode.
+        The validators (ETag and Last-Modified) come from the metadata of the
+        source, so revalidations are answered without opening the image.
+
+        The output format is negotiated from the Accept header (AVIF, WebP or
+        the JPEG fallback).
+        """
+        if preset not in PRESET_CHOICES:
+            preset = POSTER_SQUARED
+
+        if not default_storage.exists(image_url):
+            return HttpResponseNotFound('Image not found.')
+
+        output_format = negotiate(request.META.get('HTTP_ACCEPT', ''))
+        version, modified = source_metadata(image_url)
+        etag = quote_etag(
+            self.store.key(image_url, preset, version, output_format))
+        last_modified = int(modified.timestamp())
+
+        response = get_conditional_response(request, etag=etag,
+                                            last_modified=last_modified)
+        if response is None:
+            content = self.store.get(image_url, preset, version, output_format)
+            if content is None:
+                try:
+                    content = self.render_family(image_url, preset, version,
+                                                 output_format)
+                except (ImageTooLarge, RenderBusy) as error:
+                    return self.error_response(error)
+            response = HttpResponse(content,
+                                    content_type=ENCODERS[output_format][1])
+        return self.patch_headers(response, preset, etag, last_modified)
+
+    # pylint: disable=no-self-use
+    def error_response(self, error):
+        """Return the response of an image that couldn't be rendered."""
+        if isinstance(error, RenderBusy):
+            response = HttpResponse('Too many renders.', status=503)
+            response['Retry-After'] = '1'
             return response
-        return HttpResponseNotFound('Image not found.')
+        return HttpResponse('Image too large.', status=422)
+
+    # pylint: disable=no-self-use
+    def patch_headers(self, response, preset, etag, last_modified):
+        """Add the validators and the caching headers to the response."""
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Accept',))
+        patch_cache_control(response, public=True,
+                            max_age=get_option(preset, 'max_age'),
+                            s_maxage=get_option(preset, 's_maxage'))
+        return response
+
+    def render_family(self, image_url, preset, version, output_format):
+        """Render the preset and the missing presets of its family.
+
+        The presets of the family with the same decode mode are rendered from
+        a single decode of the source and saved in the derivative store.
+        Concurrent requests for the same family wait for the render in
+        progress instead of rendering it again. The return is the content of
+        the requested preset.
+        """
+        return single_flight(*self.family_flight(image_url, preset, version,
+                                                 output_format))
+
+    def family_flight(self, image_url, preset, version, output_format):
+        """Return the lock name, the render and the fetch of render_family."""
+        family = get_render_family(preset)
+
+        def fetch():
+            return self.store.get(image_url, preset, version, output_format)
+
+        def render():
+            # The render may have finished while the lock was being taken.
+            content = fetch()
+            if content is not None:
+                return content
+            presets = [
+                name for name in family if name == preset or
+                not self.store.exists(image_url, name, version, output_format)
+            ]
+            results = self.store.render(image_url, version, presets,
+                                        output_format)
+            return results[preset]
+
+        name = ':'.join([image_url, version, output_format, *family])
+        return name, render, fetch
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the thread pool where the async views render the thumbnails.
+
+    The pool is bounded by THUMBNAIL_THREAD_POOL_SIZE. Pillow releases the
+    GIL while decoding, resizing and encoding, so the threads run in parallel.
+    """
+    # pylint: disable=global-statement
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_THREAD_POOL_SIZE,
+                thread_name_prefix='thumbnail')
+    return _executor
+
+
+def _offload(func, *args):
+    """Run the blocking function in a thread outside the event loop."""
+    return sync_to_async(func, thread_sensitive=False)(*args)
+
+
+class AsyncGeneratorView(GeneratorView):
+    """The Generator view class for ASGI deployments.
+
+    The storage calls run in threads outside the event loop and the render
+    runs in the bounded pool of get_executor, so one process keeps many
+    thumbnail requests in flight.
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        """Return the view function marked as a coroutine function."""
+        view = super().as_view(**initkwargs)
+        if markcoroutinefunction:
+            return markcoroutinefunction(view)
+        # pylint: disable=protected-access
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        return view
+
+    async def options(self, request, *args, **kwargs):
+        """Handle the HTTP OPTIONS requests, awaitable like the other ones."""
+        return super().options(request, *args, **kwargs)
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        """Return the 405 response, awaitable like the other handlers."""
+        return super().http_method_not_allowed(request, *args, **kwargs)
+
+    async def get(self, request, path):
+        """Handle the HTTP GET requests."""
+        preset = request.GET.get('preset')
+        return await self.afit(request, os.path.join(settings.PHOTO_DIR, path),
+                               preset)
+
+    async def afit(self, request, image_url, preset):
+        """Crops the image to be in the right aspect ratio (see fit)."""
+        if preset not in PRESET_CHOICES:
+            preset = POSTER_SQUARED
+
+        if not await _offload(default_storage.exists, image_url):
+            return HttpResponseNotFound('Image not found.')
+
+        output_format = negotiate(request.META.get('HTTP_ACCEPT', ''))
+        version, modified = await _offload(source_metadata, image_url)
+        etag = quote_etag(
+            self.store.key(image_url, preset, version, output_format))
+        last_modified = int(modified.timestamp())
+
+        response = get_conditional_response(request, etag=etag,
+                                            last_modified=last_modified)
+        if response is None:
+            content = await _offload(self.store.get, image_url, preset,
+                                     version, output_format)
+            if content is None:
+                try:
+                    content = await self.arender_family(image_url, preset,
+                                                        version, output_format)
+                except (ImageTooLarge, RenderBusy) as error:
+                    return self.error_response(error)
+            response = HttpResponse(content,
+                                    content_type=ENCODERS[output_format][1])
+        return self.patch_headers(response, preset, etag, last_modified)
+
+    async def arender_family(self, image_url, preset, version, output_format):
+        """Render the preset and its family (see render_family).
+
+        The concurrent requests wait for the render in progress on the event
+        loop, only the render runs in the pool of get_executor.
+        """
+        name, render, fetch = self.family_flight(image_url, preset, version,
+                                                 output_format)
+        loop = asyncio.get_running_loop()
+        return await asingle_flight(
+            name, lambda: loop.run_in_executor(get_executor(), render),
+            lambda: _offload(fetch))
@@ -0,0 +1,201 @@
+"""Module with the command that builds the static files of the apps."""
+import io
+import os
+import json
+import glob
+import hashlib
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from django_base.libs.files import write_atomic
+from django_base.libs.minify import minify_css, minify_svg
+
+try:
+    # Requires the fonttools and brotli (for WOFF2) packages.
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+except ImportError:
+    subset = TTFont = None
+
+
+# Changing it rebuilds all the files (e.g. when the minifiers change).
+BUILD_VERSION = '2'
+
+# File (in each static directory) with the hashes of the built sources.
+HASHES_NAME = '.build-hashes.json'
+
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf')
+
+# The characters of the languages of the site (LANGUAGES), the only glyphs
+# kept in the fonts: the printable ASCII and Latin-1 symbols, the
+# typographic quotes and dashes, and the accented letters of each language.
+COMMON_CHARACTERS = ('U+0020-007E,U+00A0-00BF,U+00D7,U+00F7,U+2013-2014,'
+                     'U+2018-201A,U+201C-201E,U+2022,U+2026,U+20AC')
+LANGUAGE_CHARACTERS = {
+    'en': '',
+    'pt': 'U+00C0-00C3,U+00C7-00CA,U+00CC-00CD,U+00D2-00D5,U+00D9-00DA,'
+          'U+00DC,U+00E0-00E3,U+00E7-00EA,U+00EC-00ED,U+00F2-00F5,'
+          'U+00F9-00FA,U+00FC',
+}
+
+
+def static_dirs():
+    """Return the static directories of the apps of the project."""
+    return [
+        os.path.join(app_config.path, 'static')
+        for app_config in apps.get_app_configs()
+        if app_config.path.startswith(str(settings.BASE_DIR)) and
+        os.path.isdir(os.path.join(app_config.path, 'static'))
+    ]
+
+
+def css_targets(static_dir):
+    """Yield the CSS sources and their <name>.min.css targets."""
+    for source in glob.glob(os.path.join(static_dir, '*', 'css', '**', '*.css'),
+                            recursive=True):
+        if not source.endswith('.min.css'):
+            yield source, f'{source[:-len(".css")]}.min.css', build_css
+
+
+def svg_targets(static_dir):
+    """Yield the SVG sources and their targets under <app>/build/."""
+    for source in glob.glob(os.path.join(static_dir, '*', '**', '*.svg'),
+                            recursive=True):
+        namespace, path = os.path.relpath(source, static_dir).split(os.sep, 1)
+        if path.split(os.sep, 1)[0] != 'build':
+            yield source, os.path.join(static_dir, namespace, 'build', path), \
+                build_svg
+
+
+def font_targets(static_dir):
+    """Yield the fonts and their WOFF2 subsets under <app>/build/."""
+    for source in glob.glob(os.path.join(static_dir, '*', 'font', '**', '*'),
+                            recursive=True):
+        if not source.endswith(FONT_EXTENSIONS):
+            continue
+        namespace, path = os.path.relpath(source, static_dir).split(os.sep, 1)
+        path = f'{os.path.splitext(path)[0]}.woff2'
+        yield source, os.path.join(static_dir, namespace, 'build', path), \
+            build_font
+
+
+def language_characters():
+    """Return the Unicode ranges of the characters of the LANGUAGES."""
+    ranges = [COMMON_CHARACTERS]
+    for code, _ in settings.LANGUAGES:
+        try:
+            characters = LANGUAGE_CHARACTERS[code.split('-')[0]]
+        except KeyError as error:
+            raise CommandError(
+                f'The characters of the {code} language are unknown, add '
+                f'them to LANGUAGE_CHARACTERS.') from error
+        if characters:
+            ranges.append(characters)
+    return ','.join(ranges)
+
+
+def build_options(build):
+    """Return the options of the build function that change its output."""
+    if build is build_font:
+        return language_characters()
+    return ''
+
+
+def build_css(content):
+    """Return the minified CSS."""
+    return minify_css(content.decode()).encode()
+
+
+def build_svg(content):
+    """Return the optimized SVG."""
+    return minify_svg(content.decode()).encode()
+
+
+def build_font(content):
+    """Return the WOFF2 font with the glyphs of the languages of the site."""
+    if subset is None:
+        raise CommandError('The fonttools and brotli packages are required '
+                           'to build the fonts.')
+    font = TTFont(io.BytesIO(content))
+    options = subset.Options()
+    options.flavor = 'woff2'
+    # The hinting instructions are ignored by the browsers but on old
+    # Windows versions, and are about a third of the bytes of the fonts.
+    options.hinting = False
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=subset.parse_unicodes(language_characters()))
+    subsetter.subset(font)
+
+    output = io.BytesIO()
+    font.flavor = 'woff2'
+    font.save(output)
+    return output.getvalue()
+
+
+class Command(BaseCommand):
+    """Build the minified CSS, the optimized SVG and the subset fonts of
+    the apps."""
+
+    help = ('Minifies the CSS files under the static/<app>/css directories of '
+            'the apps into <name>.min.css and optimizes their SVG files into '
+            'static/<app>/build/, the files used by the inline_css and '
+            'embed_svg tags. The fonts under static/<app>/font are subset '
+            'to the characters of the LANGUAGES into WOFF2 files under '
+            'static/<app>/build/font/, the files of the @font-face rules. '
+            'Only the sources changed since the last build are processed. '
+            'Run it before collectstatic (bin/post_compile on Heroku).')
+
+    # The functions that yield the (source, target, build) of each kind of
+    # file in a static directory.
+    targets = (css_targets, svg_targets, font_targets)
+
+    def add_arguments(self, parser):
+        parser.add_argument('static_dirs', nargs='*',
+                            help='Static directories to build (default: the '
+                                 'ones of the apps of the project).')
+        parser.add_argument('--force', action='store_true',
+                            help='Build all the files again.')
+
+    def handle(self, *args, **options):
+        built = skipped = saved = 0
+        for static_dir in options['static_dirs'] or static_dirs():
+            hashes_path = os.path.join(static_dir, HASHES_NAME)
+            hashes = {} if options['force'] else self.load_hashes(hashes_path)
+
+            for targets in self.targets:
+                for source, target, build in targets(static_dir):
+                    name = os.path.relpath(source, static_dir)
+                    with open(source, 'rb') as source_file:
+                        content = source_file.read()
+                    digest = hashlib.sha1(
+                        (BUILD_VERSION + build_options(build)).encode() +
+                        content).hexdigest()
+                    if hashes.get(name) == digest and os.path.exists(target):
+                        skipped += 1
+                        continue
+
+                    output = build(content)
+                    write_atomic(target, output)
+                    hashes[name] = digest
+                    built += 1
+                    saved += len(content) - len(output)
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'{name}: {len(content)} -> '
+                                          f'{len(output)} bytes.')
+
+            write_atomic(hashes_path, json.dumps(hashes, indent=2,
+                                                 sort_keys=True).encode())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{built} files built ({saved} bytes saved), {skipped} unchanged.'))
+
+    # pylint: disable=no-self-use
+    def load_hashes(self, path):
+        """Return the hashes of the sources of the last build."""
+        try:
+            with open(path) as hashes_file:
+                return json.load(hashes_file)
+        except (FileNotFoundError, ValueError):
+            return {}
@@ -0,0 +1,95 @@
+"""Module with the command that builds the JavaScript bundles."""
+import os
+import json
+import hashlib
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from django_base.libs.files import write_atomic
+from django_base.libs.minify import minify_js
+from django_base.libs.static import bundle_files, bundles_manifest_name
+
+
+def bundle_sources(files, language):
+    """Return the paths of the files of the bundle in the language."""
+    paths = []
+    for name in bundle_files(files, language):
+        path = finders.find(name)
+        if not path:
+            raise CommandError(f'The {name} file of the bundle was not found.')
+        paths.append(path)
+    return paths
+
+
+class Command(BaseCommand):
+    """Build the JavaScript bundles of each language of the site."""
+
+    help = ('Builds a minified file for each JavaScript bundle of '
+            'JS_BUNDLES and language of LANGUAGES, with the files of the '
+            'bundle and only the localized files of the language, named by '
+            'the hash of its content. The files of the bundles are listed '
+            'in <app>/build/js/bundles.json, read by the js_bundle tag. Run '
+            'it before collectstatic (bin/post_compile on Heroku).')
+
+    def handle(self, *args, **options):
+        built = unchanged = 0
+        for bundle, files in settings.JS_BUNDLES.items():
+            manifest_name = bundles_manifest_name(bundle)
+            # The bundles are built in the static directory of the last
+            # file (e.g. the script of the page).
+            last_file = finders.find(files[-1])
+            if not last_file:
+                raise CommandError(f'The {files[-1]} file of the bundle was '
+                                   f'not found.')
+            static_dir = last_file[:-len(files[-1])]
+            manifest_path = os.path.join(static_dir, manifest_name)
+            manifest = self.load_manifest(manifest_path)
+            previous = manifest.get(bundle, {})
+            manifest[bundle] = {}
+
+            for language, _ in settings.LANGUAGES:
+                content = '\n;\n'.join(
+                    minify_js(self.read(path))
+                    for path in bundle_sources(files, language)).encode()
+                digest = hashlib.md5(content).hexdigest()[:12]
+                name = f'{os.path.dirname(manifest_name)}/' \
+                       f'{os.path.basename(bundle)}.{language}.{digest}.js'
+                manifest[bundle][language] = name
+
+                path = os.path.join(static_dir, name)
+                if os.path.exists(path):
+                    unchanged += 1
+                    continue
+                write_atomic(path, content)
+                built += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{name}: {len(content)} bytes.')
+
+            write_atomic(manifest_path, json.dumps(manifest, indent=2,
+                                                   sort_keys=True).encode())
+            # The files of the previous build that aren't used anymore.
+            for name in set(previous.values()) - set(manifest[bundle].values()):
+                try:
+                    os.remove(os.path.join(static_dir, name))
+                except FileNotFoundError:
+                    continue
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{built} bundles built, {unchanged} unchanged.'))
+
+    # pylint: disable=no-self-use
+    def read(self, path):
+        """Return the text of the file."""
+        with open(path, encoding='utf-8') as source_file:
+            return source_file.read()
+
+    # pylint: disable=no-self-use
+    def load_manifest(self, path):
+        """Return the bundles of the last build."""
+        try:
+            with open(path) as manifest_file:
+                return json.load(manifest_file)
+        except (FileNotFoundError, ValueError):
+            return {}
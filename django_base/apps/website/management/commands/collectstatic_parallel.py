@@ -0,0 +1,153 @@
+"""Module with the command that collects the static files in parallel."""
+import os
+import json
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.staticfiles.management.commands import collectstatic
+
+from django_base.libs.files import write_atomic
+
+
+def content_hash(storage, path):
+    """Return the MD5 hex digest of the content of the file."""
+    md5 = hashlib.md5()
+    with storage.open(path) as source_file:
+        for chunk in source_file.chunks():
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class Command(collectstatic.Command):
+    """Collect the static files uploading them in parallel.
+
+    The hashes of the uploaded files are kept in a local JSON file
+    (COLLECTSTATIC_HASHES, in the temporary directory by default). The files
+    with the same hash as in the last run are skipped without any request to
+    a remote storage (a local one is checked, as its directory may have been
+    removed), and the others are uploaded by a pool of threads.
+    """
+
+    help = ('Collects the static files like collectstatic, uploading only the '
+            'files changed since the last run and in parallel.')
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--workers', type=int, default=16,
+                            help='Number of files uploaded at the same time '
+                                 '(default: 16).')
+        parser.add_argument('--refresh', action='store_true',
+                            help='Ignore the hashes of the last run and '
+                                 'upload every file.')
+
+    def set_options(self, **options):
+        super().set_options(**options)
+        self.workers = options['workers']
+        self.refresh = options['refresh']
+        self.found_files = {}
+        self.hashes = {}
+        self.uploads = []
+        try:
+            self.storage.path('')
+            self.local = True
+        except NotImplementedError:
+            self.local = False
+
+    def hashes_path(self):
+        """Return the path of the file with the hashes of the last run.
+
+        There is one file per storage location, as the hashes only describe
+        the files in the storage they were uploaded to.
+        """
+        storage = f'{type(self.storage).__name__}:' \
+                  f'{getattr(self.storage, "bucket_name", "")}:' \
+                  f'{getattr(self.storage, "location", "")}'
+        directory = settings.COLLECTSTATIC_HASHES or tempfile.gettempdir()
+        name = hashlib.sha1(storage.encode()).hexdigest()[:16]
+        return os.path.join(directory, f'collectstatic-{name}.json')
+
+    def load_hashes(self):
+        """Return the hashes of the files uploaded in the last run."""
+        if self.refresh or self.clear:
+            return {}
+        try:
+            with open(self.hashes_path()) as hashes_file:
+                return json.load(hashes_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_hashes(self):
+        """Write the hashes of the files in the storage atomically."""
+        write_atomic(self.hashes_path(), json.dumps(self.hashes).encode())
+
+    def collect(self):
+        if self.symlink or self.dry_run:
+            return super().collect()
+
+        self.hashes = self.load_hashes()
+        post_process, self.post_process = self.post_process, False
+        try:
+            with ThreadPoolExecutor(self.workers) as executor:
+                self.executor = executor
+                super().collect()
+            # The files that failed keep the hashes of the last run, so they
+            # are uploaded again by the next one.
+            for prefixed_path, digest, upload in self.uploads:
+                upload.result()
+                self.hashes[prefixed_path] = digest
+        finally:
+            self.post_process = post_process
+            self.save_hashes()
+
+        if self.post_process and hasattr(self.storage, 'post_process'):
+            self.post_process_files()
+
+        return {
+            'modified': self.copied_files,
+            'unmodified': self.unmodified_files,
+            'post_processed': self.post_processed_files,
+        }
+
+    def post_process_files(self):
+        """Post process the collected files (as collectstatic does)."""
+        processor = self.storage.post_process(self.found_files,
+                                              dry_run=self.dry_run)
+        for original_path, processed_path, processed in processor:
+            if isinstance(processed, Exception):
+                self.stderr.write(f"Post-processing '{original_path}' failed!")
+                self.stderr.write()
+                raise processed
+            if processed:
+                self.log(f"Post-processed '{original_path}' as "
+                         f"'{processed_path}'", level=2)
+                self.post_processed_files.append(original_path)
+            else:
+                self.log(f"Skipped post-processing '{original_path}'")
+
+    def copy_file(self, path, prefixed_path, source_storage):
+        if self.symlink or self.dry_run:
+            return super().copy_file(path, prefixed_path, source_storage)
+
+        self.found_files[prefixed_path] = (source_storage, path)
+        digest = content_hash(source_storage, path)
+        if self.hashes.get(prefixed_path) == digest and (
+                not self.local or self.storage.exists(prefixed_path)):
+            self.log(f"Skipping '{path}' (not modified)")
+            self.unmodified_files.append(prefixed_path)
+            return None
+
+        self.log(f"Copying '{source_storage.path(path)}'", level=2)
+        upload = self.executor.submit(self.upload, path, prefixed_path,
+                                      source_storage)
+        self.uploads.append((prefixed_path, digest, upload))
+        self.copied_files.append(prefixed_path)
+        return None
+
+    def upload(self, path, prefixed_path, source_storage):
+        """Replace the file in the storage (runs in the pool)."""
+        if self.storage.exists(prefixed_path):
+            self.storage.delete(prefixed_path)
+        with source_storage.open(path) as source_file:
+            self.storage.save(prefixed_path, source_file)
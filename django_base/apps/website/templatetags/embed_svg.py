@@ -1,39 +1,105 @@
 """Module with custom embed_svg tag."""
+import re
+import logging
+
 from django.conf import settings
 from django.template import Library
 from django.utils.safestring import mark_safe
-from django.contrib.staticfiles import finders
 
+from django_base.libs.static import (read_static, static_cache,
+                                     static_signature)
+
+
+logger = logging.getLogger(__name__)
 
 register = Library()
 
+# The attributes and the content of the root element of the SVG files.
+SVG_ROOT = re.compile(r'<svg\b([^>]*)>(.*)</svg>', re.DOTALL)
+SVG_ID = re.compile(r'\s+id=(["\']).*?\1')
+
+# The SVG files by (file, DEBUG), with the signature of the source file in
+# DEBUG (None otherwise).
+_svgs = static_cache()
+
 
 class SVGNotFound(Exception):
     """Exception raised when the SVG was not found."""
 
 
-@register.simple_tag
-def embed_svg(filename):
+class SVG:
+    """SVG file that can be embedded inline or as a symbol of a sprite."""
+
+    def __init__(self, filename, source):
+        self.source = source
+        self.symbol_id = 'svg-' + re.sub(r'[^A-Za-z0-9]+', '-',
+                                         filename.rsplit('.', 1)[0]).strip('-')
+        match = SVG_ROOT.search(source)
+        if match:
+            self.attributes = SVG_ID.sub('', match.group(1)).rstrip('/ ')
+            self.content = match.group(2)
+        else:
+            self.attributes = self.content = None
+
+    def use(self, define):
+        """Return the SVG referencing the symbol (defining it if define)."""
+        if self.content is None:
+            return mark_safe(self.source)
+        symbol = f'<symbol id="{self.symbol_id}">{self.content}</symbol>' \
+            if define else ''
+        return mark_safe(f'<svg{self.attributes}>{symbol}'
+                         f'<use href="#{self.symbol_id}"/></svg>')
+
+
+def load_svg(filename):
+    """Return the SVG of the file (None if not found) from the cache.
+
+    The files are kept in memory, in DEBUG until they change.
+    """
+    key = (filename, settings.DEBUG)
+    signature = static_signature([filename]) if settings.DEBUG else None
+    cached = _svgs.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    source = read_static(filename)
+    svg = SVG(filename, source) if source is not None else None
+    _svgs[key] = (signature, svg)
+    return svg
+
+
+@register.simple_tag(takes_context=True)
+def embed_svg(context, filename, sprite=False):
     """Returns the SVG source code to be embed in the HTML.
 
     The appname allows to embed SVG files from other apps of the project.
+
+    In the sprite mode the first use of the file in the response defines
+    its content as a <symbol> and all the uses (the first one included)
+    reference it with <use>, so icons repeated in the page are only sent
+    once: {% embed_svg 'website/svg/megaphone.svg' sprite=True %}
     """
     if not settings.DEBUG:
         parts = filename.split('/')
         parts.insert(1, 'build')
         filename = '/'.join(parts)
 
-    path = finders.find(filename, all=True)
+    svg = load_svg(filename)
 
-    if not path:
+    if svg is None:
         message = f'{filename} not found.'
         if settings.DEBUG:
             raise SVGNotFound(message)
-        else:
-            logger.warning(message)
-            return ''
-    if isinstance(path, (list, tuple)):
-        path = path[0]
-    with open(path) as svg_file:
-        svg = mark_safe(svg_file.read())
-    return svg
\ No newline at end of file
+        logger.warning(message)
+        return ''
+
+    request = context.get('request')
+    if not sprite or request is None:
+        return mark_safe(svg.source)
+
+    # The symbols defined in the response.
+    if not hasattr(request, 'svg_symbols'):
+        request.svg_symbols = set()
+    define = svg.symbol_id not in request.svg_symbols
+    request.svg_symbols.add(svg.symbol_id)
+    return svg.use(define)
@@ -1,53 +1,93 @@
 """Module with custom inline_css tag."""
 import os
+import re
+import logging
 
 from django.conf import settings
 from django.template import Library
+from django.templatetags.static import static
 from django.utils.safestring import mark_safe
 
+from django_base.libs.middleware import add_preload
+from django_base.libs.static import (read_static, static_cache,
+                                     static_signature)
+from django_base.libs.storage import STATIC_PLACEHOLDER
+
+
+logger = logging.getLogger(__name__)
 
 register = Library()
 
+# The {{static}} placeholders followed by the path of a static file.
+STATIC_REFERENCE = re.compile(re.escape(STATIC_PLACEHOLDER) + r'/([^\s\'"(),;}]+)')
+
+# The URLs of the fonts of the CSS, preloaded by the pages.
+FONT_URL = re.compile(r'url\(\s*[\'"]?([^\s\'"()]+\.(?:woff2?|ttf|otf))\b')
+
+
+# The <style> blocks and the URLs of their fonts by (file, DEBUG, static
+# domain), with the signature of the source files in DEBUG (None otherwise).
+_styles = static_cache()
+
 
 class CSSNotFound(Exception):
     """Exception raised when the CSS was not found."""
 
 
-@register.simple_tag
-def inline_css(css_file):
-    """Puts the CSS code inline in the HTML file."""
-    app_name = 'design'
+def resolve_static(css):
+    """Replace the {{static}} placeholders with the URLs of the files.
+
+    The URLs come from the static files storage, so they are the hashed
+    ones when the storage has a manifest.
+    """
+    css = STATIC_REFERENCE.sub(lambda match: static(match.group(1)), css)
+
     static_url = settings.STATIC_URL
+    if not settings.DEBUG and settings.STATIC_CUSTOM_DOMAIN:
+        static_url = f'https://{settings.STATIC_CUSTOM_DOMAIN}'
+    return css.replace(STATIC_PLACEHOLDER, static_url.rstrip('/'))
+
 
+@register.simple_tag(takes_context=True)
+def inline_css(context, css_file):
+    """Puts the CSS code inline in the HTML file.
+
+    The minified version of the file (<name>.min.css) is used when found.
+    The <style> blocks are kept in memory, in DEBUG until the files change.
+    The fonts of the CSS are preloaded, the browser would only find them
+    after parsing the page.
+    """
     file_path, file_name = os.path.split(css_file)
     file_name, ext = os.path.splitext(file_name)
 
-    files = {
-        os.path.join(app_name, file_path, f'{file_name}.min{ext}'),
-        os.path.join(app_name, css_file)
-    }
+    files = (
+        os.path.join(file_path, f'{file_name}.min{ext}'),
+        css_file,
+    )
+
+    key = (css_file, settings.DEBUG, settings.STATIC_CUSTOM_DOMAIN)
+    signature = static_signature(files) if settings.DEBUG else None
+    cached = _styles.get(key)
+    if cached is None or cached[0] != signature:
+        style = render_style(css_file, files)
+        cached = _styles[key] = (signature, style, FONT_URL.findall(style))
 
+    request = context.get('request')
+    if request is not None:
+        for url in cached[2]:
+            add_preload(request, url, 'font')
+    return cached[1]
+
+
+def render_style(css_file, files):
+    """Return the <style> block of the first CSS file found."""
     for _file in files:
-        result = finders.find(_file, all=True)
-        if result:
-            if isinstance(result, (list, tuple)):
-                result = result[0]
-            with open(result) as css_file:
-                css = mark_safe(css_file.read())
-
-            if not settings.DEBUG:
-                static_url = f'https://{settings.STATIC_CUSTOM_DOMAIN}'
-
-            css = css.replace('{{static}}', static_url.rstrip('/'))
-
-            return mark_safe(f'<style media="screen">{css}</style>')
-    else:
-        message = 'The {} file was not found by the inline_css tag.'.format(
-            files[1] # The original file (not minified).
-        )
-
-        if settings.DEBUG:
-            raise CSSNotFound(message)
-        else:
-            logger.warning(message)
-            return ''
\ No newline at end of file
+        css = read_static(_file)
+        if css is not None:
+            return mark_safe(f'<style media="screen">{resolve_static(css)}</style>')
+
+    message = f'The {css_file} file was not found by the inline_css tag.'
+    if settings.DEBUG:
+        raise CSSNotFound(message)
+    logger.warning(message)
+    return ''
@@ -0,0 +1,72 @@
+"""Module with custom js_bundle tag."""
+import json
+import logging
+
+from django.conf import settings
+from django.template import Library
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+from django.utils.translation import get_language
+
+from django_base.libs.static import (bundle_files, bundles_manifest_name,
+                                     read_static, static_cache,
+                                     static_signature)
+
+
+logger = logging.getLogger(__name__)
+
+register = Library()
+
+# The manifests of the bundles by (name, DEBUG), with the signature of the
+# manifest file in DEBUG (None otherwise).
+_manifests = static_cache()
+
+
+def load_manifest(name):
+    """Return the bundles of the manifest, kept in memory."""
+    key = (name, settings.DEBUG)
+    signature = static_signature([name]) if settings.DEBUG else None
+    cached = _manifests.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    content = read_static(name)
+    manifest = json.loads(content) if content else {}
+    _manifests[key] = (signature, manifest)
+    return manifest
+
+
+def bundle_language():
+    """Return the language of LANGUAGES of the bundles of the request.
+
+    It is the current language or the default one (LANGUAGE_CODE) when the
+    site doesn't have it.
+    """
+    languages = dict(settings.LANGUAGES)
+    for language in (get_language(), settings.LANGUAGE_CODE):
+        if not language:
+            continue
+        for code in (language, language.split('-')[0]):
+            if code in languages:
+                return code
+    return settings.LANGUAGE_CODE
+
+
+@register.simple_tag
+def js_bundle(bundle):
+    """Returns the script elements of the JavaScript bundle of the current
+    language.
+
+    The bundles are built by the bundle_js command. When the bundle wasn't
+    built the files of the bundle (JS_BUNDLES) are loaded one by one.
+    """
+    language = bundle_language()
+    name = load_manifest(bundles_manifest_name(bundle)).get(
+        bundle, {}).get(language)
+    if name is not None:
+        names = [name]
+    else:
+        logger.warning('The %s bundle was not built, run bundle_js.', bundle)
+        names = bundle_files(settings.JS_BUNDLES[bundle], language)
+    return format_html_join('\n', '<script src="{}"></script>',
+                            ((static(name),) for name in names))
@@ -0,0 +1,24 @@
+"""Module with custom preload tag."""
+from django.template import Library
+from django.templatetags.static import static
+
+from django_base.libs.middleware import add_preload
+
+
+register = Library()
+
+
+@register.simple_tag(takes_context=True)
+def preload(context, path, kind):
+    """Returns the URL of the static file and preloads it in the response.
+
+    The kind is the "as" of the preload link (style, script, font, image).
+    Use it in the tags of the files the page needs early, e.g.
+    <link href="{% preload 'app/css/page.css' 'style' %}" rel="stylesheet">,
+    or with "as" to only preload a file (e.g. a font of the CSS).
+    """
+    url = static(path)
+    request = context.get('request')
+    if request is not None:
+        add_preload(request, url, kind)
+    return url
@@ -0,0 +1,22 @@
+"""Module with the integration test cases of the ASGI entry point."""
+import os
+import sys
+import subprocess
+
+from django.conf import settings
+from django.test import SimpleTestCase, tag
+
+
+@tag('integration')
+class ASGITest(SimpleTestCase):
+    """Integration test case of the django_base.asgi module."""
+
+    def test_import_without_settings_module(self):
+        """Test the module imports without DJANGO_SETTINGS_MODULE set."""
+        environment = {name: value for name, value in os.environ.items()
+                       if name != 'DJANGO_SETTINGS_MODULE'}
+        result = subprocess.run(
+            [sys.executable, '-c', 'import django_base.asgi'],
+            cwd=settings.BASE_DIR, env=environment, capture_output=True,
+            text=True, check=False)
+        self.assertEqual(result.returncode, 0, result.stderr)
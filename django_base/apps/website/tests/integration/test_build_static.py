@@ -0,0 +1,121 @@
+"""Module with the integration test cases of the build_static command."""
+import os
+import re
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings, tag
+
+from django_base.apps.website.management.commands import build_static
+
+WEBSITE_STATIC = os.path.join(settings.BASE_DIR, 'django_base', 'apps',
+                              'website', 'static')
+FONT = os.path.join(WEBSITE_STATIC, 'website', 'font',
+                    'lato-v17-latin-regular.woff2')
+
+
+@tag('integration')
+class BuildStaticTest(SimpleTestCase):
+    """Integration test case of the build_static command."""
+
+    def setUp(self):
+        """Set up a static directory with a CSS and a SVG file."""
+        self.static_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_dir)
+        self.write('app/css/page.css', 'a {\n  color: red;\n}\n')
+        self.write('app/svg/icon.svg', '<!-- icon -->\n<svg>\n</svg>\n')
+
+    def write(self, name, content):
+        """Write the content to the file of the static directory."""
+        path = os.path.join(self.static_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as static_file:
+            static_file.write(content)
+
+    def read(self, name):
+        """Return the content of the file of the static directory."""
+        with open(os.path.join(self.static_dir, name)) as static_file:
+            return static_file.read()
+
+    def build(self):
+        """Run the command and return its output."""
+        out = StringIO()
+        call_command('build_static', self.static_dir, stdout=out)
+        return out.getvalue()
+
+    def test_builds_files(self):
+        """Test the minified CSS and the optimized SVG are written."""
+        self.assertIn('2 files built', self.build())
+        self.assertEqual(self.read('app/css/page.min.css'), 'a{color:red}')
+        self.assertEqual(self.read('app/build/svg/icon.svg'), '<svg></svg>')
+
+    def test_apps_static_dirs(self):
+        """Test the static directories of the apps are built by default."""
+        self.assertIn(WEBSITE_STATIC, build_static.static_dirs())
+
+        out = StringIO()
+        with mock.patch.object(build_static.Command, 'targets',
+                               (build_static.css_targets,)), \
+                mock.patch.object(build_static, 'write_atomic') as write:
+            call_command('build_static', stdout=out)
+        self.assertIn('files built', out.getvalue())
+        self.assertIn(os.path.join(WEBSITE_STATIC, build_static.HASHES_NAME),
+                      [call[0][0] for call in write.call_args_list])
+
+    def test_incremental(self):
+        """Test only the changed sources are built again."""
+        self.build()
+        self.assertIn('0 files built', self.build())
+        self.assertIn('2 unchanged', self.build())
+
+        self.write('app/css/page.css', 'a { color: blue; }')
+        self.assertIn('1 files built', self.build())
+        self.assertEqual(self.read('app/css/page.min.css'), 'a{color:blue}')
+
+    @skipUnless(build_static.subset, 'fonttools is not installed')
+    def test_subsets_fonts(self):
+        """Test the fonts are subset into smaller WOFF2 files."""
+        os.makedirs(os.path.join(self.static_dir, 'app', 'font'))
+        shutil.copy(FONT, os.path.join(self.static_dir, 'app', 'font',
+                                       'lato.woff2'))
+        self.assertIn('3 files built', self.build())
+        self.assertLess(
+            os.path.getsize(os.path.join(self.static_dir, 'app', 'build',
+                                         'font', 'lato.woff2')),
+            os.path.getsize(FONT))
+
+    def test_fonts_require_fonttools(self):
+        """Test the fonts can't be built without fonttools."""
+        self.write('app/font/lato.ttf', 'font')
+        with mock.patch.object(build_static, 'subset', None), \
+                self.assertRaises(CommandError):
+            self.build()
+
+    def test_font_faces(self):
+        """Test the fonts of master.css are the ones built by the command."""
+        css_dir = os.path.join(WEBSITE_STATIC, 'website', 'css')
+        with open(os.path.join(css_dir, 'master.css')) as css_file:
+            css = css_file.read()
+        urls = re.findall(r"url\('([^']+)'\)", css)
+        targets = [target for _, target, _ in
+                   build_static.font_targets(WEBSITE_STATIC)]
+        self.assertEqual(len(urls), 3)
+        for url in urls:
+            self.assertIn(os.path.normpath(os.path.join(css_dir, url)), targets)
+
+        # The families are used by the rules, otherwise never downloaded.
+        rules = re.sub(r'@font-face\s*{[^}]*}', '', css)
+        for family in set(re.findall(r"font-family: ('[^']+')", css)):
+            self.assertIn(family, rules)
+
+    @override_settings(LANGUAGES=[('en', 'English'), ('de', 'German')])
+    def test_unknown_language(self):
+        """Test the languages without the characters can't be built."""
+        self.write('app/font/lato.ttf', 'font')
+        with self.assertRaises(CommandError):
+            self.build()
@@ -0,0 +1,113 @@
+"""Module with the integration test cases of the bundle_js command."""
+import os
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings, tag
+from django.utils import translation
+
+
+@tag('integration')
+class BundleJSTest(SimpleTestCase):
+    """Integration test case of the bundle_js command and js_bundle tag."""
+
+    def setUp(self):
+        """Set up a static directory with the files of a bundle."""
+        self.static_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_dir)
+        self.write('app/js/lib.min.js', 'var lib = 1;')
+        self.write('app/js/messages_pt_BR.js', 'var messages = "pt";')
+        self.write('app/js/page.js', 'function page() {\n    lib();\n}\n')
+
+        override = override_settings(
+            DEBUG=True, STATIC_URL='/static/',
+            STATICFILES_DIRS=[self.static_dir], STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'],
+            LANGUAGES=[('en', 'English'), ('pt', 'Portuguese')],
+            LANGUAGE_CODE='en',
+            JS_BUNDLES={'app/page': ['app/js/lib.min.js',
+                                     'app/js/messages_{locale}.js',
+                                     'app/js/page.js']},
+            JS_BUNDLE_LOCALES={'pt': 'pt_BR'})
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write(self, name, content):
+        """Write the content to the file of the static directory."""
+        path = os.path.join(self.static_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as static_file:
+            static_file.write(content)
+
+    def read(self, name):
+        """Return the content of the file of the static directory."""
+        with open(os.path.join(self.static_dir, name)) as static_file:
+            return static_file.read()
+
+    def bundle(self):
+        """Run the command and return its output."""
+        out = StringIO()
+        call_command('bundle_js', stdout=out)
+        return out.getvalue()
+
+    def bundles(self):
+        """Return the bundles of the manifest by language."""
+        return json.loads(self.read('app/build/js/bundles.json'))['app/page']
+
+    def test_bundles_by_language(self):
+        """Test each language has its messages and the minified scripts."""
+        self.assertIn('2 bundles built', self.bundle())
+        bundles = self.bundles()
+        self.assertRegex(bundles['pt'], r'^app/build/js/page\.pt\.[0-9a-f]{12}\.js$')
+        self.assertEqual(self.read(bundles['en']),
+                         'var lib = 1;\n;\nfunction page() {\nlib();\n}')
+        self.assertEqual(self.read(bundles['pt']),
+                         'var lib = 1;\n;\nvar messages = "pt";\n;\n'
+                         'function page() {\nlib();\n}')
+
+    def test_incremental(self):
+        """Test the unchanged bundles are kept and the old ones removed."""
+        self.bundle()
+        self.assertIn('2 unchanged', self.bundle())
+
+        old_bundles = self.bundles()
+        self.write('app/js/messages_pt_BR.js', 'var messages = "pt-BR";')
+        self.assertIn('1 bundles built, 1 unchanged', self.bundle())
+        self.assertEqual(self.bundles()['en'], old_bundles['en'])
+        self.assertFalse(os.path.exists(
+            os.path.join(self.static_dir, old_bundles['pt'])))
+
+    def test_missing_file(self):
+        """Test the bundles with missing files aren't built."""
+        os.remove(os.path.join(self.static_dir, 'app/js/lib.min.js'))
+        with self.assertRaises(CommandError):
+            self.bundle()
+
+    def test_tag(self):
+        """Test the tag uses the bundle of the current language."""
+        self.bundle()
+        bundles = self.bundles()
+        template = Template("{% load js_bundle %}{% js_bundle 'app/page' %}")
+        for language, bundle in (('pt-br', 'pt'), ('de', 'en')):
+            with translation.override(language):
+                self.assertEqual(
+                    template.render(Context()),
+                    f'<script src="/static/{bundles[bundle]}"></script>')
+
+    def test_tag_without_bundles(self):
+        """Test the tag loads the files of the bundle when it wasn't built."""
+        template = Template("{% load js_bundle %}{% js_bundle 'app/page' %}")
+        with translation.override('pt-br'), self.assertLogs(
+                'django_base.apps.website.templatetags.js_bundle', 'WARNING'):
+            self.assertEqual(template.render(Context()), '\n'.join([
+                '<script src="/static/app/js/lib.min.js"></script>',
+                '<script src="/static/app/js/messages_pt_BR.js"></script>',
+                '<script src="/static/app/js/page.js"></script>',
+            ]))
+        with translation.override('en'):
+            self.assertNotIn('messages', template.render(Context()))
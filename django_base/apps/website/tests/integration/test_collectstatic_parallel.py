@@ -0,0 +1,68 @@
+"""Module with the integration test cases of collectstatic_parallel."""
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings, tag
+
+
+@tag('integration')
+class CollectstaticParallelTest(SimpleTestCase):
+    """Integration test case of the collectstatic_parallel command."""
+
+    def setUp(self):
+        """Set up a static directory with two files and a static root."""
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.source = os.path.join(self.location, 'source')
+        self.root = os.path.join(self.location, 'root')
+        os.makedirs(os.path.join(self.source, 'css'))
+        for name in ('css/a.css', 'css/b.css'):
+            self.write(name, name)
+
+        override = override_settings(
+            STATICFILES_DIRS=[self.source], STATIC_ROOT=self.root,
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'],
+            COLLECTSTATIC_HASHES=os.path.join(self.location, 'hashes'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write(self, name, content):
+        """Write the content to the source file."""
+        with open(os.path.join(self.source, name), 'w') as source_file:
+            source_file.write(content)
+
+    def collect(self, **options):
+        """Run the command and return the names saved in the storage."""
+        with mock.patch.object(FileSystemStorage, 'save',
+                               side_effect=FileSystemStorage.save,
+                               autospec=True) as save:
+            call_command('collectstatic_parallel', interactive=False,
+                         workers=2, stdout=StringIO(), **options)
+        return sorted(call[0][1] for call in save.call_args_list)
+
+    def test_uploads_changed_files(self):
+        """Test only the files changed since the last run are copied."""
+        self.assertEqual(self.collect(), ['css/a.css', 'css/b.css'])
+        self.assertEqual(self.collect(), [])
+
+        self.write('css/b.css', 'changed')
+        self.assertEqual(self.collect(), ['css/b.css'])
+        with open(os.path.join(self.root, 'css/b.css')) as copy:
+            self.assertEqual(copy.read(), 'changed')
+
+    def test_refresh(self):
+        """Test the refresh option copies every file again."""
+        self.collect()
+        self.assertEqual(self.collect(refresh=True), ['css/a.css', 'css/b.css'])
+
+    def test_removed_root(self):
+        """Test the files missing in a local storage are copied again."""
+        self.collect()
+        shutil.rmtree(self.root)
+        self.assertEqual(self.collect(), ['css/a.css', 'css/b.css'])
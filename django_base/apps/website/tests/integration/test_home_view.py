@@ -2,6 +2,8 @@
 from unittest import mock
 
 from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
 from django.utils import translation
 from django.urls import reverse, resolve
 from django.test import TestCase, Client, tag
@@ -33,3 +35,16 @@ class HomeViewTest(TestCase):
         endpoint = reverse('home')
         response = self.client.get(endpoint)
         self.assertEqual(response.status_code, 200)
+
+    def test_home_page_cached(self):
+        """Test the page of the anonymous users is rendered once."""
+        cache.clear()
+        endpoint = reverse('website:home')
+        with mock.patch('django_base.apps.website.views.home.render',
+                        wraps=render) as render_mock:
+            first = self.client.get(endpoint)
+            second = self.client.get(endpoint)
+        self.assertEqual(render_mock.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second['Cache-Control'],
+                         'public, max-age=86400, s-maxage=2592000')
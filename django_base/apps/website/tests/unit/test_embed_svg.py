@@ -0,0 +1,70 @@
+"""Module with the unit test cases of the embed_svg tag."""
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, override_settings, tag
+
+from django_base.apps.website.templatetags import embed_svg as embed_svg_module
+
+ICON = ('<?xml version="1.0"?>\n'
+        '<svg xmlns="http://www.w3.org/2000/svg" id="Layer_1" '
+        'viewBox="0 0 10 10"><path d="M0 0h10v10z"/></svg>')
+
+
+@tag('unit')
+@override_settings(DEBUG=True)
+class EmbedSVGTest(SimpleTestCase):
+    """Unit test case of the embed_svg tag."""
+
+    def setUp(self):
+        """Set up a static directory with a SVG file."""
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        os.makedirs(os.path.join(self.location, 'website', 'svg'))
+        with open(os.path.join(self.location, 'website', 'svg', 'icon.svg'),
+                  'w') as svg_file:
+            svg_file.write(ICON)
+
+        override = override_settings(
+            STATICFILES_DIRS=[self.location], STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'])
+        override.enable()
+        self.addCleanup(override.disable)
+
+    # pylint: disable=no-self-use
+    def render(self, template, request=None):
+        """Render the template with the embed_svg library."""
+        return Template('{% load embed_svg %}' + template).render(
+            Context({'request': request}))
+
+    def test_inline(self):
+        """Test the SVG file is embedded as it is."""
+        self.assertEqual(self.render("{% embed_svg 'website/svg/icon.svg' %}"),
+                         ICON)
+
+    def test_cached(self):
+        """Test the file is only read once."""
+        with mock.patch.object(embed_svg_module, 'read_static',
+                               wraps=embed_svg_module.read_static) as read:
+            self.render("{% embed_svg 'website/svg/icon.svg' %}"
+                        "{% embed_svg 'website/svg/icon.svg' %}")
+        self.assertEqual(read.call_count, 1)
+
+    def test_sprite(self):
+        """Test the sprite mode sends the content once per request."""
+        template = "{% embed_svg 'website/svg/icon.svg' sprite=True %}"
+        request = RequestFactory().get('/')
+        first = self.render(template, request)
+        second = self.render(template, request)
+
+        self.assertEqual(
+            first, '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+                   '<symbol id="svg-website-svg-icon"><path d="M0 0h10v10z"/>'
+                   '</symbol><use href="#svg-website-svg-icon"/></svg>')
+        self.assertEqual(
+            second, '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+                    '<use href="#svg-website-svg-icon"/></svg>')
+        self.assertIn('<symbol', self.render(template, RequestFactory().get('/')))
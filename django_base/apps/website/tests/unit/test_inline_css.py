@@ -0,0 +1,70 @@
+"""Module with the unit test cases of the inline_css tag."""
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.template import Context
+from django.test import RequestFactory, SimpleTestCase, override_settings, tag
+
+from django_base.apps.website.templatetags import inline_css as inline_css_module
+from django_base.apps.website.templatetags.inline_css import inline_css
+
+
+@tag('unit')
+class InlineCSSTest(SimpleTestCase):
+    """Unit test case of the inline_css tag."""
+
+    def setUp(self):
+        """Set up a static directory with a CSS file."""
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        os.makedirs(os.path.join(self.location, 'website', 'css'))
+        self.write('page.css', 'a { color: red; }')
+
+        override = override_settings(
+            STATICFILES_DIRS=[self.location], STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'])
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write(self, name, content, mtime=None):
+        """Write the CSS file (with the modified time)."""
+        path = os.path.join(self.location, 'website', 'css', name)
+        with open(path, 'w') as css_file:
+            css_file.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    @override_settings(DEBUG=False)
+    def test_cached(self):
+        """Test the file is only read in the first render."""
+        with mock.patch.object(inline_css_module, 'read_static',
+                               wraps=inline_css_module.read_static) as read:
+            style = inline_css(Context(), 'website/css/page.css')
+            self.assertEqual(inline_css(Context(), 'website/css/page.css'), style)
+        self.assertEqual(style, '<style media="screen">a { color: red; }</style>')
+        # The minified file and the original.
+        self.assertEqual(read.call_count, 2)
+
+    @override_settings(DEBUG=True)
+    def test_debug_invalidation(self):
+        """Test the changed files are read again in DEBUG."""
+        self.write('page.css', 'a { color: red; }', mtime=1)
+        inline_css(Context(), 'website/css/page.css')
+        self.write('page.css', 'a { color: blue; }', mtime=2)
+        self.assertIn('blue', inline_css(Context(), 'website/css/page.css'))
+
+        self.write('page.min.css', 'a{color:blue}')
+        self.assertIn('a{color:blue}', inline_css(Context(), 'website/css/page.css'))
+
+    @override_settings(DEBUG=False, STATIC_URL='/static/')
+    def test_preloads_fonts(self):
+        """Test the fonts of the CSS are preloaded by the page."""
+        self.write('page.css', '@font-face { src: url("{{static}}/website/'
+                               'font/a.woff2") format("woff2"); }')
+        request = RequestFactory().get('/')
+        request.preloads = {}
+        inline_css(Context({'request': request}), 'website/css/page.css')
+        self.assertEqual(list(request.preloads.values()), [
+            '</static/website/font/a.woff2>; rel=preload; as=font; crossorigin'])
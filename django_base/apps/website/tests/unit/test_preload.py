@@ -0,0 +1,85 @@
+"""Module with the unit test cases of the preload of the static files."""
+from django.http import HttpResponse, JsonResponse
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, override_settings, tag
+
+from django_base.libs.middleware import EarlyHintsMiddleware, PreloadMiddleware
+
+LINK = b'</static/a.css>; rel=preload; as=style'
+
+
+@tag('unit')
+@override_settings(STATIC_URL='/static/')
+class PreloadMiddlewareTest(SimpleTestCase):
+    """Unit test case of the PreloadMiddleware class and the preload tag."""
+
+    def view(self, request):
+        """Render a page that preloads a style sheet and a font."""
+        template = Template(
+            "{% load preload %}"
+            "<link href=\"{% preload 'website/css/master.css' 'style' %}\">"
+            "{% preload 'website/font/a.woff2' 'font' as _ %}")
+        return HttpResponse(template.render(Context({'request': request})))
+
+    def test_page_preloads(self):
+        """Test the pages preload the files of the tags."""
+        response = PreloadMiddleware(self.view)(RequestFactory().get('/'))
+        self.assertEqual(response['Link'], ', '.join([
+            '</static/website/css/master.css>; rel=preload; as=style',
+            '</static/website/font/a.woff2>; rel=preload; as=font; crossorigin',
+        ]))
+
+    def test_pages_without_preloads(self):
+        """Test the pages that preload nothing (e.g. the admin) have no
+        Link header."""
+        response = PreloadMiddleware(lambda request: HttpResponse('page'))(
+            RequestFactory().get('/'))
+        self.assertFalse(response.has_header('Link'))
+
+    def test_other_responses(self):
+        """Test the responses that aren't HTML pages don't preload."""
+        response = PreloadMiddleware(lambda request: JsonResponse({}))(
+            RequestFactory().get('/'))
+        self.assertFalse(response.has_header('Link'))
+
+
+@tag('unit')
+class EarlyHintsMiddlewareTest(SimpleTestCase):
+    """Unit test case of the EarlyHintsMiddleware class."""
+
+    async def app(self, scope, receive, send):
+        """Send a page with a Link header."""
+        # pylint: disable=unused-argument
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'link', LINK)]})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def request(self, middleware, extensions):
+        """Make a request to the middleware and return the sent messages."""
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/',
+                 'extensions': extensions}
+        await middleware(scope, None, send)
+        return [message['type'] for message in messages], messages
+
+    async def test_early_hints(self):
+        """Test the links of the last response are sent before the page."""
+        middleware = EarlyHintsMiddleware(self.app)
+        extensions = {'http.response.early_hint': {}}
+        types, _ = await self.request(middleware, extensions)
+        self.assertEqual(types, ['http.response.start', 'http.response.body'])
+
+        types, messages = await self.request(middleware, extensions)
+        self.assertEqual(types[0], 'http.response.early_hint')
+        self.assertEqual(messages[0]['links'], [LINK])
+
+    async def test_unsupported_server(self):
+        """Test the hints aren't sent without the extension."""
+        middleware = EarlyHintsMiddleware(self.app)
+        await self.request(middleware, {})
+        types, _ = await self.request(middleware, {})
+        self.assertEqual(types, ['http.response.start', 'http.response.body'])
@@ -0,0 +1,100 @@
+"""Module with the unit test cases of the content-hashed static files."""
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.template import Context
+from django.test import SimpleTestCase, override_settings, tag
+
+from django_base.apps.website.templatetags.embed_svg import embed_svg
+from django_base.apps.website.templatetags.inline_css import inline_css
+from django_base.libs.storage import ManifestStaticStorage
+
+
+@tag('unit')
+class ManifestStaticStorageTest(SimpleTestCase):
+    """Unit test case of the ManifestStaticStorage class."""
+
+    def setUp(self):
+        """Set up a storage without reading the manifest from S3."""
+        patcher = mock.patch.object(ManifestStaticStorage, 'load_manifest',
+                                    return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.storage = ManifestStaticStorage()
+
+    def test_hashed_files_immutable(self):
+        """Test only the hashed files are cached for a year."""
+        parameters = self.storage.get_object_parameters(
+            'website/css/home.0123456789ab.css')
+        self.assertEqual(parameters['CacheControl'],
+                         'public, max-age=31536000, immutable')
+        self.assertNotIn('CacheControl', self.storage.get_object_parameters(
+            'website/css/home.css'))
+        self.assertNotIn('CacheControl', self.storage.get_object_parameters(
+            'staticfiles.json'))
+
+    def test_deployed_files_not_uploaded(self):
+        """Test the hashed files of the last deploy aren't uploaded again."""
+        # pylint: disable=protected-access
+        self.storage._deployed = frozenset(['home.0123456789ab.css'])
+        with mock.patch('storages.backends.s3boto3.S3Boto3Storage._save') \
+                as save:
+            self.assertTrue(self.storage.exists('home.0123456789ab.css'))
+            self.storage._save('home.0123456789ab.css', ContentFile(b''))
+        save.assert_not_called()
+
+    def test_placeholders_kept(self):
+        """Test the {{static}} placeholders aren't hashed."""
+        converter = self.storage.url_converter('website/css/home.css', {})
+        match = self.storage._patterns['*.css'][0][0].search(
+            'body { background: url({{static}}/website/img/bg.png); }')
+        self.assertEqual(converter(match),
+                         'url({{static}}/website/img/bg.png)')
+
+
+@tag('unit')
+class ManifestInlineTagsTest(SimpleTestCase):
+    """Unit test case of the inline tags with a manifest storage."""
+
+    def setUp(self):
+        """Set up a manifest storage with a CSS and a SVG file."""
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        override = override_settings(
+            DEBUG=False, STATIC_ROOT=self.location,
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.'
+                                'ManifestStaticFilesStorage')
+        override.enable()
+        self.addCleanup(override.disable)
+
+        paths = {
+            'website/css/page.css': 'a { background: {{static}}/website/a.png; }',
+            'website/a.png': 'png',
+            'website/build/svg/icon.svg': '<svg></svg>',
+        }
+        for name, content in paths.items():
+            os.makedirs(os.path.dirname(os.path.join(self.location, name)),
+                        exist_ok=True)
+            with open(os.path.join(self.location, name), 'w') as file:
+                file.write(content)
+
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        list(staticfiles_storage.post_process(
+            {name: (staticfiles_storage, name) for name in paths}))
+
+    def test_inline_css_hashed(self):
+        """Test the inline CSS points to the hashed files."""
+        css = inline_css(Context(), 'website/css/page.css')
+        self.assertRegex(css, r'background: /static/website/a\.[0-9a-f]{12}\.png;')
+
+    def test_inline_css_missing(self):
+        """Test a file missing from the manifest is skipped."""
+        self.assertEqual(inline_css(Context(), 'website/css/missing.css'), '')
+
+    def test_embed_svg(self):
+        """Test the SVG is read through the manifest."""
+        self.assertEqual(embed_svg(Context(), 'website/svg/icon.svg'),
+                         '<svg></svg>')
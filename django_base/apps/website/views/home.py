@@ -4,12 +4,15 @@ from django.views.generic import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_control
 
+from django_base.libs.cache import cache_anonymous_page
+
 
 class HomeView(View):
     """View of the Homepage."""
 
     @method_decorator(cache_control(public=True, max_age=86400,
                                     s_maxage=2592000))
+    @method_decorator(cache_anonymous_page())
     def get(self, request):
         """Handle the HTTP GET method."""
 
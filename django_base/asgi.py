@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_base.settings')
 
 application = get_asgi_application()
+
+# The middleware reads the settings, so it is imported after the setup.
+from django_base.libs.middleware import EarlyHintsMiddleware  # noqa: E402 pylint: disable=wrong-import-position
+
+# Sends the preloads of the pages in 103 Early Hints when the server can.
+application = EarlyHintsMiddleware(application)
@@ -0,0 +1,196 @@
+"""Module with the cache functions of the project."""
+import math
+import time
+import random
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils import translation
+
+
+class TieredCache(BaseCache):
+    """Cache with a small in-memory cache of the process in front of another.
+
+    The values read from the shared cache (the L2 option, the alias of a
+    cache such as Redis or Memcached) are kept in the memory of the process
+    for L1_TIMEOUT seconds, so the hot keys don't go to the cache server in
+    every request. The writes go to both. The values in memory can be stale
+    for L1_TIMEOUT seconds when another process changes them, so the keys
+    that must always be read from the shared cache (e.g. locks) are listed
+    in the L1_EXCLUDE prefixes.
+
+    The keys are passed as they are, the prefix and the version of the
+    shared cache apply.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.l2_alias = options['L2']
+        self.l1_timeout = options.get('L1_TIMEOUT', 5)
+        self.l1_exclude = tuple(options.get('L1_EXCLUDE', ()))
+        # The LocMemCache instances with the same name share the memory, so
+        # all the threads of the process use the same L1.
+        self.l1 = LocMemCache(f'tiered:{location or self.l2_alias}', {
+            'TIMEOUT': self.l1_timeout,
+            'OPTIONS': {'MAX_ENTRIES': options.get('L1_MAX_ENTRIES', 1000)},
+        })
+
+    @property
+    def l2(self):
+        """Return the shared cache (of the thread)."""
+        return caches[self.l2_alias]
+
+    def _local(self, key):
+        return not key.startswith(self.l1_exclude)
+
+    def _l1_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.l2.default_timeout
+        if timeout is None:
+            return self.l1_timeout
+        return min(timeout, self.l1_timeout)
+
+    def get(self, key, default=None, version=None):
+        if self._local(key):
+            value = self.l1.get(key, self, version)
+            if value is not self:
+                return value
+        value = self.l2.get(key, self, version)
+        if value is self:
+            return default
+        if self._local(key):
+            self.l1.set(key, value, self.l1_timeout, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version)
+        if self._local(key):
+            self.l1.set(key, value, self._l1_timeout(timeout), version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version)
+        if added and self._local(key):
+            self.l1.set(key, value, self._l1_timeout(timeout), version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self.l1.delete(key, version)
+        return self.l2.delete(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        self.l1.delete(key, version)
+        return self.l2.incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        self.l1.delete(key, version)
+        return self.l2.decr(key, delta, version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, self, version) is not self
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+
+def xfetch(key, recompute, timeout, beta=None):
+    """Return the cached value of the key, recomputing it when needed.
+
+    The value is recomputed before it expires with a probability that grows
+    as the expiry gets closer and with the time the last recomputation took
+    (the XFetch algorithm), so the requests of a popular key don't all miss
+    the cache at the same time when it expires. A greater beta recomputes
+    earlier (XFETCH_BETA by default).
+
+    The recompute function returns the value, or None to not cache it.
+    """
+    beta = settings.XFETCH_BETA if beta is None else beta
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None:
+        value, delta, expiry = entry
+        # 1 - random() is in (0, 1], log(0) is undefined.
+        if now - delta * beta * math.log(1 - random.random()) < expiry:
+            return value
+
+    start = time.time()
+    value = recompute()
+    if value is not None:
+        delta = time.time() - start
+        cache.set(key, (value, delta, now + timeout), timeout)
+    return value
+
+
+def is_anonymous(request):
+    """Return True if the request is from an anonymous user.
+
+    The requests without the session cookie don't load the session (which
+    would add Vary: Cookie to the response).
+    """
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return True
+    return not request.user.is_authenticated
+
+
+def page_key(request):
+    """Return the cache key of the page of the request."""
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page:{translation.get_language()}:{request.get_host()}:{url}'
+
+
+def cache_anonymous_page(timeout=None):
+    """Decorator that caches the pages of the anonymous users.
+
+    The pages are cached by language, host and path for timeout seconds
+    (PAGE_CACHE_TIMEOUT by default) and recomputed with xfetch. The
+    authenticated users, the methods other than GET and HEAD and the
+    responses that aren't 200, set cookies or use the CSRF token skip the
+    cache.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or \
+                    not is_anonymous(request):
+                return view(request, *args, **kwargs)
+
+            responses = []
+
+            def render():
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response = response.render()
+                responses.append(response)
+                if response.status_code != 200 or response.streaming or \
+                        response.cookies or request.META.get('CSRF_COOKIE_USED'):
+                    return None
+                return (response.content, list(response.items()),
+                        dict(getattr(request, 'preloads', {})))
+
+            page = xfetch(page_key(request), render,
+                          timeout or settings.PAGE_CACHE_TIMEOUT)
+            if responses:
+                return responses[0]
+
+            content, headers, preloads = page
+            # The files preloaded by the templates of the page.
+            if hasattr(request, 'preloads'):
+                request.preloads.update(preloads)
+            response = HttpResponse(content)
+            for header, value in headers:
+                response[header] = value
+            return response
+        return wrapper
+    return decorator
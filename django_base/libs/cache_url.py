@@ -0,0 +1,100 @@
+"""Module with the parser of the cache URLs (like DATABASE_URL).
+
+It is imported by the settings, so it must not use the Django settings.
+"""
+import os
+import hashlib
+from urllib.parse import parse_qsl, urlsplit, unquote
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'pylibmc': 'django.core.cache.backends.memcached.PyLibMCCache',
+    # Requires the django-redis package.
+    'redis': 'django_redis.cache.RedisCache',
+    'rediss': 'django_redis.cache.RedisCache',
+}
+
+# Query parameters that are settings of the cache (the others are OPTIONS).
+SETTINGS = ('timeout', 'key_prefix', 'version')
+
+
+def _cast(value):
+    """Return the value as an int or a float when it is a number."""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            continue
+    return value
+
+
+def parse_cache_url(url):
+    """Return the cache settings (a CACHES entry) of the URL.
+
+    Examples:
+        locmem://[name]
+        dummy://
+        file:///var/tmp/django_cache
+        db://cache_table
+        memcached://host1:11211,host2:11211 (or memcached:///path/to/socket)
+        pylibmc://host:11211
+        redis://[:password@]host:6379/0 (or rediss:// for TLS)
+
+    The query parameters timeout, key_prefix and version are settings of
+    the cache and the others are OPTIONS, e.g. ?timeout=600&MAX_ENTRIES=1000.
+    """
+    parsed = urlsplit(url)
+    if parsed.scheme not in BACKENDS:
+        raise ImproperlyConfigured(f'Unknown cache URL scheme: {parsed.scheme}')
+
+    if parsed.scheme in ('redis', 'rediss'):
+        location = parsed._replace(query='').geturl()
+    elif parsed.scheme in ('memcached', 'pylibmc'):
+        location = parsed.netloc.split(',') if parsed.netloc else \
+            f'unix:{parsed.path}'
+    elif parsed.scheme == 'file':
+        location = unquote(parsed.path)
+    else:
+        location = unquote(parsed.netloc or parsed.path.lstrip('/'))
+
+    cache = {'BACKEND': BACKENDS[parsed.scheme], 'LOCATION': location}
+    options = {}
+    for name, value in parse_qsl(parsed.query):
+        if name.lower() in SETTINGS:
+            cache[name.upper()] = _cast(value) if name.lower() != 'key_prefix' \
+                else value
+        else:
+            options[name] = _cast(value)
+    if options:
+        cache['OPTIONS'] = options
+    return cache
+
+
+def code_version(directory, extensions=('.py', '.html'),
+                 exclude=('__pycache__',)):
+    """Return a hash of the files of the directory with the extensions.
+
+    The directories with the names in exclude aren't walked (e.g. the
+    media and the collected static files). It is part of the default prefix
+    of the cache keys (CACHE_VERSION) when the release version isn't known,
+    so each deploy that changes the code gets new keys.
+    """
+    digest = hashlib.md5()
+    for root, directories, files in os.walk(directory):
+        directories[:] = sorted(name for name in directories
+                                if name not in exclude)
+        for name in sorted(files):
+            if not name.endswith(extensions):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, directory).encode())
+            with open(path, 'rb') as code_file:
+                digest.update(code_file.read())
+    return digest.hexdigest()[:12]
@@ -0,0 +1,28 @@
+"""Module with the functions used to write local files."""
+import os
+import tempfile
+
+
+def write_atomic(path, content):
+    """Write the content (bytes or a File) to the file atomically.
+
+    The content is written to a temporary file in the same directory that
+    then replaces the file, so the readers never see a partial file. Return
+    the size of the content.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    chunks = content.chunks() if hasattr(content, 'chunks') else [content]
+    size = 0
+    try:
+        with os.fdopen(descriptor, 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                size += len(chunk)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return size
@@ -0,0 +1,216 @@
+"""Module with the middlewares of the project."""
+import os
+import mimetypes
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags
+
+from .storage import HASHED_NAME, IMMUTABLE_CACHE_CONTROL
+
+
+class StaticFile:
+    """File of STATIC_ROOT with its headers and its compressed copies."""
+
+    # The compressed copies in the order of preference.
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, name, path):
+        stat = os.stat(path)
+        self.path = path
+        self.content_type = mimetypes.guess_type(name)[0] or \
+            'application/octet-stream'
+        self.etag = f'{stat.st_size:x}-{stat.st_mtime_ns:x}'
+        self.last_modified = http_date(stat.st_mtime)
+        self.cache_control = IMMUTABLE_CACHE_CONTROL \
+            if HASHED_NAME.search(name) else \
+            f'public, max-age={settings.STATIC_MAX_AGE}'
+        self.variants = [
+            (encoding, path + extension, os.path.getsize(path + extension))
+            for encoding, extension in self.encodings
+            if os.path.exists(path + extension)
+        ]
+        self.size = stat.st_size
+
+    def select(self, accept_encoding):
+        """Return the encoding (None for identity), path and size to send."""
+        accepted = {value.split(';')[0].strip()
+                    for value in accept_encoding.split(',')}
+        for encoding, path, size in self.variants:
+            if encoding in accepted:
+                return encoding, path, size
+        return None, self.path, self.size
+
+
+class StaticFilesMiddleware:
+    """Serve the files of STATIC_ROOT (collected by collectstatic).
+
+    For the deployments without a separate static server or a CDN. The
+    compressed copies written by CompressedStaticFilesMixin are sent to
+    the clients that accept them, the responses have an ETag (with 304 for
+    the matching If-None-Match) and the content-hashed files are cached for
+    a year.
+
+    The files are indexed at startup, so the requests never touch the disk
+    but to read the file sent. It isn't used in DEBUG (runserver serves the
+    static files) or without STATIC_ROOT (e.g. static files on S3).
+    """
+
+    def __init__(self, get_response):
+        static_root = getattr(settings, 'STATIC_ROOT', None)
+        if settings.DEBUG or not static_root or \
+                not settings.STATIC_URL.startswith('/'):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.files = self.index(static_root)
+
+    # pylint: disable=no-self-use
+    def index(self, static_root):
+        """Return a dict with the names and the StaticFile of the files."""
+        files = {}
+        compressed = tuple(extension for _, extension in StaticFile.encodings)
+        for directory, _, names in os.walk(static_root):
+            for name in names:
+                if name.startswith('.') or name.endswith(compressed):
+                    continue
+                path = os.path.join(directory, name)
+                relative_name = os.path.relpath(path, static_root)
+                files[relative_name.replace(os.sep, '/')] = \
+                    StaticFile(relative_name, path)
+        return files
+
+    def __call__(self, request):
+        if not request.path_info.startswith(self.prefix):
+            return self.get_response(request)
+
+        static_file = self.files.get(request.path_info[len(self.prefix):])
+        if static_file is None:
+            return self.get_response(request)
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return self.serve(request, static_file)
+
+    # pylint: disable=no-self-use
+    def serve(self, request, static_file):
+        """Return the response with the file (or 304)."""
+        encoding, path, size = static_file.select(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        etag = f'"{static_file.etag}-{encoding}"' if encoding else \
+            f'"{static_file.etag}"'
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (etag in parse_etags(if_none_match) or
+                              if_none_match.strip() == '*'):
+            response = HttpResponse(status=304)
+        elif request.method == 'HEAD':
+            response = HttpResponse(content_type=static_file.content_type)
+            response['Content-Length'] = size
+        else:
+            response = FileResponse(open(path, 'rb'),
+                                    content_type=static_file.content_type)
+            response['Content-Length'] = size
+
+        if encoding and response.status_code == 200:
+            response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = static_file.last_modified
+        response['Cache-Control'] = static_file.cache_control
+        if static_file.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+def preload_link(url, kind):
+    """Return the Link header value that preloads the URL."""
+    link = f'<{url}>; rel=preload; as={kind}'
+    # The fonts are always fetched in CORS mode, the preloads too.
+    if kind == 'font':
+        link += '; crossorigin'
+    return link
+
+
+def add_preload(request, url, kind):
+    """Preload the URL (a file of the kind, the "as" of the link) in the
+    response of the request.
+
+    Called by the template tags that use files the browser only finds after
+    parsing the page (e.g. the fonts of the inline CSS).
+    """
+    preloads = getattr(request, 'preloads', None)
+    if preloads is not None:
+        preloads.setdefault(url, preload_link(url, kind))
+
+
+class PreloadMiddleware:
+    """Add the Link headers that preload the critical files of the pages.
+
+    The HTML pages preload the files added by the templates with
+    add_preload (e.g. the preload tag), so the browser starts to download
+    them with the headers of the page.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.preloads = {}
+        response = self.get_response(request)
+        if response.streaming or response.status_code != 200 or \
+                not response.get('Content-Type', '').startswith('text/html'):
+            return response
+
+        links = list(request.preloads.values())
+        if response.has_header('Link'):
+            links.insert(0, response['Link'])
+        if links:
+            response['Link'] = ', '.join(links)
+        return response
+
+
+class EarlyHintsMiddleware:
+    """ASGI middleware that sends the preloads of the pages in a 103 Early
+    Hints response, before the view runs.
+
+    The hints of a path are the Link headers of its last 200 response, so
+    the browser downloads the critical files while the page is rendered.
+    It is only used when the server supports the http.response.early_hint
+    extension of ASGI (e.g. Hypercorn).
+    """
+
+    # Paths with hints kept, the hints are cleared when there are more.
+    max_paths = 1000
+
+    def __init__(self, app):
+        self.app = app
+        self.hints = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'GET' or \
+                'http.response.early_hint' not in scope.get('extensions', {}):
+            return await self.app(scope, receive, send)
+
+        path = scope['path']
+        links = self.hints.get(path)
+        if links:
+            await send({'type': 'http.response.early_hint', 'links': links})
+
+        async def send_and_learn(message):
+            if message['type'] == 'http.response.start':
+                self.learn(path, message)
+            await send(message)
+
+        return await self.app(scope, receive, send_and_learn)
+
+    def learn(self, path, message):
+        """Keep the Link headers of the response as the hints of the path."""
+        links = [value for name, value in message.get('headers', ())
+                 if name.lower() == b'link']
+        if message['status'] != 200 or not links:
+            self.hints.pop(path, None)
+            return
+        if path not in self.hints and len(self.hints) >= self.max_paths:
+            self.hints.clear()
+        self.hints[path] = links
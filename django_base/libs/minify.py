@@ -0,0 +1,80 @@
+"""Module with the minifiers of the static files.
+
+The minifiers are conservative: they only remove what never changes the
+result (comments, whitespace and editor metadata), so they don't need a
+full parser.
+"""
+import re
+
+
+# The strings and the comments of the CSS files.
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/',
+                        re.DOTALL)
+CSS_SPACES = re.compile(r'\s+')
+# Spaces that can be removed around the punctuation (not around the : of
+# the selectors, as "a :hover" differs from "a:hover").
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+CSS_DECLARATION = re.compile(r':\s+')
+CSS_LAST_SEMICOLON = re.compile(r';}')
+
+SVG_PROLOG = re.compile(r'<\?xml.*?\?>|<!DOCTYPE[^>]*>|<!--.*?-->'
+                        r'|<metadata\b.*?</metadata>', re.DOTALL)
+SVG_ROOT = re.compile(r'<svg\b[^>]*>')
+# Attributes of the editors that don't change the rendering of the root
+# element (x and y are 0 by default only on the <svg>, not on e.g. <mask>).
+SVG_ATTRIBUTES = re.compile(
+    r'\s+(?:(?:version|xml:space|enable-background)="[^"]*"'
+    r'|[xy]="0(?:px)?"|style="enable-background:[^";]*;?")(?=[\s/>])')
+SVG_SPACES_BETWEEN_TAGS = re.compile(r'>\s+<')
+SVG_SPACES = re.compile(r'\s+')
+
+# The template literals and the strings continued in the next line, where
+# the whitespace at the start of the lines is part of the string.
+JS_MULTILINE_STRING = re.compile(r'`|\\\r?\n')
+
+
+def minify_css(css):
+    """Return the CSS without comments and unneeded whitespace."""
+    parts = []
+    position = 0
+    for match in CSS_TOKENS.finditer(css):
+        parts.append(_minify_css_code(css[position:match.start()]))
+        # Keep the strings, drop the comments.
+        if match.group(1):
+            parts.append(match.group(1))
+        position = match.end()
+    parts.append(_minify_css_code(css[position:]))
+    return ''.join(parts).strip()
+
+
+def _minify_css_code(code):
+    code = CSS_SPACES.sub(' ', code)
+    code = CSS_PUNCTUATION.sub(r'\1', code)
+    # The spaces after the colons of the declarations (and of the selectors
+    # with a space before, which keeps it).
+    code = CSS_DECLARATION.sub(':', code)
+    return CSS_LAST_SEMICOLON.sub('}', code)
+
+
+def minify_svg(svg):
+    """Return the SVG without prolog, comments, metadata and whitespace.
+
+    The result can be embedded in the HTML.
+    """
+    svg = SVG_PROLOG.sub('', svg)
+    svg = SVG_ROOT.sub(lambda match: SVG_ATTRIBUTES.sub('', match.group()),
+                       svg, count=1)
+    svg = SVG_SPACES_BETWEEN_TAGS.sub('><', svg)
+    return SVG_SPACES.sub(' ', svg).strip()
+
+
+def minify_js(js):
+    """Return the JavaScript without indentation and blank lines.
+
+    The code isn't parsed, so the line breaks are kept (the semicolons can
+    be omitted at the end of the lines) and the code with multiline strings
+    is returned unchanged.
+    """
+    if JS_MULTILINE_STRING.search(js):
+        return js
+    return '\n'.join(line.strip() for line in js.splitlines() if line.strip())
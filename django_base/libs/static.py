@@ -0,0 +1,104 @@
+"""Module with the functions used to read the static files."""
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .storage import open_or_none
+
+
+# The dicts returned by static_cache.
+_static_caches = []
+
+
+def static_cache():
+    """Return a new dict for the values read from the static files.
+
+    The dicts are cleared when a STATIC setting changes (tests), as their
+    values would be read from other files.
+    """
+    cache = {}
+    _static_caches.append(cache)
+    return cache
+
+
+@receiver(setting_changed)
+def _clear_static_caches(setting, **kwargs):
+    """Clear the dicts of static_cache when the static files change."""
+    # pylint: disable=unused-argument
+    if setting.startswith('STATIC'):
+        for cache in _static_caches:
+            cache.clear()
+
+
+def read_static(name):
+    """Return the text of the static file or None if it doesn't exist.
+
+    Out of DEBUG, with a storage that has a manifest (ManifestStaticStorage),
+    the file is read from its hashed name in the storage, the same one the
+    static tag points to. Otherwise the file is looked up by the finders.
+    """
+    if not settings.DEBUG and hasattr(staticfiles_storage, 'stored_name'):
+        try:
+            stored_name = staticfiles_storage.stored_name(name)
+        except ValueError:
+            return None
+        file = open_or_none(staticfiles_storage, stored_name)
+        if file is None:
+            return None
+        with file:
+            return file.read().decode()
+
+    path = finders.find(name)
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as static_file:
+        return static_file.read()
+
+
+def static_signature(names):
+    """Return the paths and modified times of the static files found.
+
+    It changes when any of the files is edited, created or deleted, so it
+    is used to invalidate the caches of the files in DEBUG.
+    """
+    signature = []
+    for name in names:
+        path = finders.find(name)
+        if path:
+            try:
+                signature.append((path, os.stat(path).st_mtime_ns))
+            except FileNotFoundError:
+                continue
+    return tuple(signature)
+
+
+def bundles_manifest_name(bundle):
+    """Return the static name of the manifest of the JavaScript bundle.
+
+    The bundles of an app (e.g. account/signup) are built under its
+    <app>/build/js/ directory, listed by language in its bundles.json.
+    """
+    namespace = bundle.split('/', 1)[0]
+    return f'{namespace}/build/js/bundles.json'
+
+
+def bundle_files(files, language):
+    """Return the static names of the files of a bundle in the language.
+
+    The {locale} of the names is the locale of the language
+    (JS_BUNDLE_LOCALES, the language by default). The localized files that
+    don't exist are left out, e.g. the messages of the default language.
+    """
+    locale = settings.JS_BUNDLE_LOCALES.get(language, language)
+    names = []
+    for name in files:
+        if '{locale}' in name:
+            name = name.format(locale=locale)
+            if not finders.find(name):
+                continue
+        names.append(name)
+    return names
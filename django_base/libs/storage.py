@@ -1,17 +1,737 @@
 """Module with the storage classes."""
+import os
+import re
+import gzip
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestFilesMixin, ManifestStaticFilesStorage, StaticFilesStorage)
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils._os import safe_join
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
 from storages.backends.s3boto3 import S3Boto3Storage
 
+from .files import write_atomic
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+# Placeholder of the static URL in the CSS files put inline in the pages.
+STATIC_PLACEHOLDER = '{{static}}'
+
+
+class MetadataCacheMixin:
+    """Storage mixin that caches the metadata of the files.
+
+    The existence, size, ETag and modified time of each file are kept in the
+    Django cache for STORAGE_METADATA_TTL seconds, so calls like exists(),
+    size() and get_modified_time() don't go to the storage every time (e.g.
+    a HEAD request per call on S3). The entries are invalidated when the
+    file is saved or deleted through the storage. The missing files are only
+    kept for STORAGE_METADATA_MISSING_TTL seconds, as they may be created by
+    processes that don't share the cache.
+    """
+
+    def metadata_prefix(self):
+        """Return the prefix of the cache keys of the storage."""
+        return f'{type(self).__name__}:{getattr(self, "location", "")}'
+
+    def _metadata_key(self, name):
+        value = f'{self.metadata_prefix()}:{name}'
+        return f'storage:metadata:{hashlib.sha1(value.encode()).hexdigest()}'
+
+    def metadata(self, name):
+        """Return a dict with the metadata of the file.
+
+        The dict has the exists key and, for the files that exist, the size,
+        etag and modified (POSIX timestamp) keys.
+        """
+        metadata = cache.get(self._metadata_key(name))
+        if metadata is None:
+            metadata = self._fetch_metadata(name)
+            self._cache_metadata(name, metadata)
+        return metadata
+
+    def _cache_metadata(self, name, metadata):
+        timeout = settings.STORAGE_METADATA_TTL if metadata['exists'] else \
+            settings.STORAGE_METADATA_MISSING_TTL
+        cache.set(self._metadata_key(name), metadata, timeout)
+
+    def invalidate(self, name):
+        """Remove the cached metadata of the file."""
+        cache.delete(self._metadata_key(name))
+
+    def _fetch_metadata(self, name):
+        """Read the metadata of the file from the storage.
+
+        Reads the file system, the remote storages override it.
+        """
+        try:
+            stat = os.stat(self.path(name))
+        except FileNotFoundError:
+            return {'exists': False}
+        return {
+            'exists': True,
+            'size': stat.st_size,
+            'etag': f'{stat.st_size:x}-{stat.st_mtime_ns:x}',
+            'modified': stat.st_mtime,
+        }
+
+    def _require_metadata(self, name):
+        metadata = self.metadata(name)
+        if not metadata['exists']:
+            raise FileNotFoundError(f'File does not exist: {name}')
+        return metadata
+
+    def exists(self, name):
+        return self.metadata(name)['exists']
+
+    def size(self, name):
+        return self._require_metadata(name)['size']
+
+    def etag(self, name):
+        """Return the ETag of the file."""
+        return self._require_metadata(name)['etag']
+
+    def get_modified_time(self, name):
+        timestamp = self._require_metadata(name)['modified']
+        if settings.USE_TZ:
+            return datetime.fromtimestamp(timestamp, timezone.utc)
+        return datetime.fromtimestamp(timestamp)
+
+    def open_or_none(self, name):
+        """Open the file for reading or return None if it doesn't exist.
+
+        The storages that support it open the file and read its metadata in
+        a single request, and the metadata cache is refreshed with it.
+        """
+        try:
+            file, metadata = self._open_with_metadata(name)
+        except FileNotFoundError:
+            self._cache_metadata(name, {'exists': False})
+            return None
+        self._cache_metadata(name, metadata)
+        return file
+
+    def _open_with_metadata(self, name):
+        """Open the file and return it with its metadata."""
+        file = self.open(name)
+        return file, self._fetch_metadata(name)
+
+    def _save(self, name, content):
+        self.invalidate(name)
+        name = super()._save(name, content)
+        self.invalidate(name)
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        self.invalidate(name)
+
+
+def open_or_none(storage, name):
+    """Open the file of the storage or return None if it doesn't exist.
+
+    Uses a single request when the storage supports it (see
+    MetadataCacheMixin.open_or_none).
+    """
+    if hasattr(storage, 'open_or_none'):
+        return storage.open_or_none(name)
+    try:
+        return storage.open(name)
+    except FileNotFoundError:
+        return None
+
+
+class CachedFileSystemStorage(MetadataCacheMixin, FileSystemStorage):
+    """File system storage with the metadata cache (used in development)."""
+
+
+def list_files(storage, path):
+    """Return the names of all the files under the path of the storage.
+
+    The storages that support it (SharedConnectionMixin) list them with a
+    request per 1000 files, the others walk the directories. Raises
+    FileNotFoundError when the directory doesn't exist in a local storage.
+    """
+    if hasattr(storage, 'list_files'):
+        return storage.list_files(path)
+    directories, files = storage.listdir(path)
+    names = [os.path.join(path, name) for name in sorted(files)]
+    for name in sorted(directories):
+        names.extend(list_files(storage, os.path.join(path, name)))
+    return names
+
+
+def client_config():
+    """Return the botocore configuration shared by the S3 storages."""
+    return Config(
+        max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.AWS_S3_CONNECT_TIMEOUT,
+        read_timeout=settings.AWS_S3_READ_TIMEOUT,
+        tcp_keepalive=settings.AWS_S3_TCP_KEEPALIVE,
+        retries={'mode': settings.AWS_S3_RETRY_MODE,
+                 'total_max_attempts': settings.AWS_S3_MAX_ATTEMPTS},
+    )
+
+
+_sessions = {}
+_clients = {}
+_resources = threading.local()
+_connections_lock = threading.Lock()
+
+
+def _connection_key(storage):
+    """Return the key of the connections a storage can share."""
+    return repr((storage.session_profile, storage.access_key,
+                 storage.secret_key, storage.security_token,
+                 storage.region_name, storage.use_ssl, storage.endpoint_url,
+                 storage.verify, storage.addressing_style,
+                 storage.signature_version, storage.proxies))
+
+
+def _connection_options(storage):
+    return {
+        'region_name': storage.region_name,
+        'use_ssl': storage.use_ssl,
+        'endpoint_url': storage.endpoint_url,
+        'config': storage.config,
+        'verify': storage.verify,
+    }
+
+
+def _get_session(key, storage):
+    """Return the boto3 session of the key (call with the lock held)."""
+    if key not in _sessions:
+        # pylint: disable=protected-access
+        _sessions[key] = storage._create_session()
+    return _sessions[key]
+
+
+def get_client(storage):
+    """Return the S3 client of the process for the storage.
+
+    The clients are thread safe, so all the threads and the storages with
+    the same credentials and options share one client and its connection
+    pool.
+    """
+    key = _connection_key(storage)
+    client = _clients.get(key)
+    if client is None:
+        with _connections_lock:
+            if key not in _clients:
+                session = _get_session(key, storage)
+                _clients[key] = session.client(
+                    's3', **_connection_options(storage))
+            client = _clients[key]
+    return client
+
+
+def reset_connections(*storages):
+    """Drop the S3 connections inherited from the parent process.
+
+    A forked process (e.g. a worker of a multiprocessing pool) shares the
+    sockets of the connections its parent opened, so it calls this before
+    using the storages to open its own.
+    """
+    _sessions.clear()
+    _clients.clear()
+    _resources.__dict__.clear()
+    for storage in storages:
+        storage = getattr(storage, 'remote', storage)
+        if hasattr(storage, '_connections'):
+            # pylint: disable=protected-access
+            storage._connections = threading.local()
+            storage._bucket = None
+
+
+def get_resource(storage):
+    """Return the S3 resource of the thread for the storage.
+
+    The resources aren't thread safe, so each thread has one, shared by the
+    storages with the same credentials and options.
+    """
+    key = _connection_key(storage)
+    resources = getattr(_resources, 'resources', None)
+    if resources is None:
+        resources = _resources.resources = {}
+    if key not in resources:
+        # Creating clients from a session isn't thread safe.
+        with _connections_lock:
+            session = _get_session(key, storage)
+            resources[key] = session.resource(
+                's3', **_connection_options(storage))
+    return resources[key]
+
+
+class SharedConnectionMixin:
+    """S3 storage mixin that shares the connections of the process.
+
+    The default S3Boto3Storage creates a session and a resource per
+    storage and thread, each with a pool of 10 connections. With this
+    mixin the storages use the settings of client_config and share the
+    connections (see get_client and get_resource).
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.config = self.config.merge(client_config())
+
+    @property
+    def connection(self):
+        return get_resource(self)
+
+    @property
+    def client(self):
+        """Return the S3 client shared by the threads."""
+        return get_client(self)
+
+    @property
+    def bucket(self):
+        """Return the bucket of the resource of the current thread.
+
+        S3Boto3Storage keeps the bucket of the first thread that asked for
+        it, which would share that thread's resource with the others.
+        """
+        return self.connection.Bucket(self.bucket_name)
+
+    def list_files(self, path):
+        """Return the names of all the files under the path (see list_files)."""
+        prefix = self._normalize_name(self._clean_name(path)).rstrip('/') + '/'
+        location = self.location.strip('/')
+        paginator = self.client.get_paginator('list_objects_v2')
+        names = []
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for entry in page.get('Contents', ()):
+                key = entry['Key']
+                names.append(key[len(location) + 1:] if location else key)
+        return names
+
+
+# The names of the content-hashed files (e.g. master.0123456789ab.css).
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}(\.[^./]+)?$')
+
+# Cache-Control of the content-hashed files, which never change.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
 
-class StaticStorage(S3Boto3Storage):
+
+class CompressedStaticFilesMixin:
+    """Static storage mixin that writes compressed copies of the files.
+
+    After the post processing of the storage (e.g. the hashed names of the
+    manifest) each text file gets a .gz copy, and a .br copy when the brotli
+    package is installed, so StaticFilesMiddleware serves them without
+    compressing in the requests. The copies that aren't smaller than the
+    file and the ones of unchanged files are skipped.
+    """
+
+    compressed_extensions = ('.css', '.js', '.svg', '.json', '.map', '.txt',
+                             '.html', '.xml', '.ico', '.ttf', '.otf', '.eot')
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set(paths)
+        if hasattr(super(), 'post_process'):
+            for name, hashed_name, processed in super().post_process(
+                    paths, dry_run, **options):
+                yield name, hashed_name, processed
+                if hashed_name and not isinstance(processed, Exception):
+                    names.add(hashed_name)
+        if dry_run:
+            return
+
+        for name in sorted(names):
+            # The intermediate files of the hashing are deleted.
+            if not name.endswith(self.compressed_extensions) or \
+                    not self.exists(name):
+                continue
+            for compressed_name in self.compress(name):
+                yield name, compressed_name, True
+
+    def compress(self, name):
+        """Write the compressed copies of the file and return their names."""
+        path = self.path(name)
+        with open(path, 'rb') as static_file:
+            content = static_file.read()
+        compressors = [('.gz', lambda data: gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            compressors.append(('.br', brotli.compress))
+
+        names = []
+        for extension, compress in compressors:
+            compressed_path = path + extension
+            # The content of the hashed names never changes (the manifest
+            # writes the CSS files again in each run).
+            if os.path.exists(compressed_path) and (
+                    HASHED_NAME.search(name) or
+                    os.path.getmtime(compressed_path) >= os.path.getmtime(path)):
+                continue
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                # The copy of the previous content would be served.
+                try:
+                    os.remove(compressed_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with open(compressed_path, 'wb') as compressed_file:
+                compressed_file.write(compressed)
+            names.append(name + extension)
+        return names
+
+
+class CompressedStaticFilesStorage(CompressedStaticFilesMixin,
+                                   StaticFilesStorage):
+    """Local static storage with compressed copies of the files."""
+
+
+class CompressedManifestStaticFilesStorage(CompressedStaticFilesMixin,
+                                           ManifestStaticFilesStorage):
+    """Local static storage with hashed names and compressed copies."""
+
+
+class StaticStorage(SharedConnectionMixin, S3Boto3Storage):
     """Storage manager of static files."""
 
     bucket_name = settings.STATIC_AWS_BUCKET
     custom_domain = settings.STATIC_CUSTOM_DOMAIN
 
 
-class MediaStorage(S3Boto3Storage):
+class ManifestStaticStorage(ManifestFilesMixin, StaticStorage):
+    """Storage manager of static files with content-hashed names.
+
+    The collectstatic command uploads a copy of each file with the hash of
+    its content in the name (with the references in the CSS files pointing
+    to the hashed names) and the staticfiles.json manifest, which the static
+    tag uses to return the hashed URLs. The hashed files never change, so
+    they are cached for a year, and the ones in the manifest of the previous
+    deploy aren't uploaded again.
+
+    The {{static}} placeholders of the CSS files are kept as they are, the
+    inline_css tag resolves them.
+    """
+
+    _deployed = frozenset()
+
+    def get_object_parameters(self, name):
+        parameters = super().get_object_parameters(name)
+        if HASHED_NAME.search(name):
+            parameters['CacheControl'] = IMMUTABLE_CACHE_CONTROL
+        return parameters
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def placeholder_converter(matchobj):
+            if matchobj.group(2).startswith(STATIC_PLACEHOLDER):
+                return matchobj.group(1)
+            return converter(matchobj)
+        return placeholder_converter
+
+    def post_process(self, *args, **kwargs):
+        # The hashed names of the last deploy are already in the bucket
+        # with the same content.
+        self._deployed = frozenset(self.load_manifest().values())
+        try:
+            yield from super().post_process(*args, **kwargs)
+        finally:
+            self._deployed = frozenset()
+
+    def exists(self, name):
+        return name in self._deployed or super().exists(name)
+
+    def delete(self, name):
+        if name not in self._deployed:
+            super().delete(name)
+
+    def _save(self, name, content):
+        if name in self._deployed:
+            return name
+        return super()._save(name, content)
+
+
+class MediaStorage(MetadataCacheMixin, SharedConnectionMixin, S3Boto3Storage):
     """Storage manager of uploaded files."""
 
     bucket_name = settings.MEDIA_AWS_BUCKET
     custom_domain = settings.MEDIA_CUSTOM_DOMAIN
+
+    def metadata_prefix(self):
+        return f'{self.bucket_name}:{self.location}'
+
+    def _fetch_metadata(self, name):
+        """Read the metadata of the object with a HEAD request."""
+        key = self._normalize_name(self._clean_name(name))
+        try:
+            response = self.client.head_object(
+                Bucket=self.bucket_name, Key=key)
+        except ClientError as error:
+            if error.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                return {'exists': False}
+            raise
+        return self._response_metadata(response)
+
+    def _open_with_metadata(self, name):
+        """Open the object with a single GET request.
+
+        The default open() makes a HEAD request before reading the object.
+        """
+        key = self._normalize_name(self._clean_name(name))
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket_name, Key=key)
+        except ClientError as error:
+            if error.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                raise FileNotFoundError(f'File does not exist: {name}') \
+                    from error
+            raise
+        return File(response['Body'], name), self._response_metadata(response)
+
+    # pylint: disable=no-self-use
+    def _response_metadata(self, response):
+        return {
+            'exists': True,
+            'size': response['ContentLength'],
+            'etag': response['ETag'].strip('"'),
+            'modified': response['LastModified'].timestamp(),
+        }
+
+
+@deconstructible
+class LocalCacheStorage(Storage):
+    """Storage that keeps a copy of the files of a remote storage on disk.
+
+    The files are read from the local copy when there is one, otherwise they
+    are downloaded from the remote storage (read through). The saved files
+    go to the remote storage and to the local copy (write through). Every
+    other operation goes to the remote storage.
+
+    The local copies are bounded by max_size bytes: when they exceed it the
+    least recently used ones are removed until they take EVICTION_RATIO of
+    it. The copies are written to temporary files and renamed, so a reader
+    never sees a partial file.
+
+    The files may be replaced in the remote storage under the same name
+    (S3Boto3Storage overwrites by default), so each copy is named by the
+    ETag of the remote file and the ETag is checked on every read, through
+    the metadata cache of the remote storage when it has one (see
+    MetadataCacheMixin). The copies of the replaced files are left to the
+    eviction. The size and the modified time come from the remote metadata
+    too, never from the copies.
+    """
+
+    EVICTION_RATIO = 0.9
+
+    def __init__(self, remote=None, location=None, max_size=None):
+        remote = remote or settings.STORAGE_CACHE_REMOTE
+        self.remote = import_string(remote)() if isinstance(remote, str) \
+            else remote
+        self.location = os.path.abspath(
+            location or settings.STORAGE_CACHE_DIR or
+            os.path.join(tempfile.gettempdir(), 'storage-cache'))
+        self.max_size = max_size or settings.STORAGE_CACHE_MAX_SIZE
+        self._used = None
+        self._lock = threading.Lock()
+
+    def local_path(self, name, etag):
+        """Return the path of the local copy of the version of the file."""
+        digest = hashlib.sha1(etag.encode()).hexdigest()[:12]
+        return safe_join(self.location, f'{name}.{digest}')
+
+    def metadata(self, name):
+        """Return a dict with the metadata of the remote file.
+
+        The keys are the ones of MetadataCacheMixin.metadata, the remote
+        storages without it are asked the size and the modified time.
+        """
+        if hasattr(self.remote, 'metadata'):
+            return self.remote.metadata(name)
+        try:
+            size = self.remote.size(name)
+            modified = self.remote.get_modified_time(name).timestamp()
+        except FileNotFoundError:
+            return {'exists': False}
+        return {
+            'exists': True,
+            'size': size,
+            'etag': f'{size:x}-{int(modified * 1000000):x}',
+            'modified': modified,
+        }
+
+    def _require_metadata(self, name):
+        metadata = self.metadata(name)
+        if not metadata['exists']:
+            raise FileNotFoundError(f'File does not exist: {name}')
+        return metadata
+
+    def etag(self, name):
+        """Return the ETag of the remote file."""
+        return self._require_metadata(name)['etag']
+
+    def _open_local(self, name, etag):
+        """Return the local copy of the file or None if there isn't one."""
+        path = self.local_path(name, etag)
+        try:
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        # The modified time tracks the last use (atime is often disabled).
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return File(file, name)
+
+    def open_or_none(self, name):
+        """Open the file for reading or return None if it doesn't exist."""
+        metadata = self.metadata(name)
+        if not metadata['exists']:
+            return None
+        file = self._open_local(name, metadata['etag'])
+        if file is not None:
+            return file
+        remote_file = open_or_none(self.remote, name)
+        if remote_file is None:
+            return None
+        with remote_file:
+            # The open refreshes the cached metadata with the ones of the
+            # downloaded version.
+            etag = self.etag(name)
+            self._store(name, etag, remote_file)
+        return self._open_local(name, etag) or self.remote.open(name)
+
+    def _open(self, name, mode='rb'):
+        if 'r' not in mode or '+' in mode:
+            return self.remote.open(name, mode)
+        file = self.open_or_none(name)
+        if file is None:
+            raise FileNotFoundError(f'File does not exist: {name}')
+        return file
+
+    def save(self, name, content, max_length=None):
+        # Any file-like object is accepted, as in Storage.save.
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.remote.save(name, content, max_length=max_length)
+        try:
+            content.seek(0)
+        except (AttributeError, OSError, ValueError):
+            return name
+        self._store(name, self.etag(name), content)
+        return name
+
+    def _store(self, name, etag, content):
+        """Write the content to the local copy of the version of the file."""
+        try:
+            size = write_atomic(self.local_path(name, etag), content)
+        except OSError:
+            # The local copy is only an optimization.
+            logger.exception('Could not cache %s locally.', name)
+            return
+        self._add_usage(size)
+
+    def _add_usage(self, size):
+        """Account the size of a new copy and evict if over the limit."""
+        with self._lock:
+            if self._used is None:
+                self._used = self._scan_usage()
+            else:
+                self._used += size
+            if self._used <= self.max_size:
+                return
+            self._used = self.evict()
+
+    def _entries(self):
+        """Return the (modified time, size, path) of the local copies."""
+        entries = []
+        for directory, _, files in os.walk(self.location):
+            for file in files:
+                path = os.path.join(directory, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove the least recently used copies and return the size left.
+
+        The directory is scanned, as other processes share it.
+        """
+        entries = sorted(self._entries())
+        used = sum(size for _, size, _ in entries)
+        target = self.max_size * self.EVICTION_RATIO
+        for _, size, path in entries:
+            if used <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            used -= size
+        return used
+
+    def delete(self, name):
+        metadata = self.metadata(name)
+        self.remote.delete(name)
+        if not metadata['exists']:
+            return
+        try:
+            os.remove(self.local_path(name, metadata['etag']))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, name):
+        return self.metadata(name)['exists']
+
+    def size(self, name):
+        return self._require_metadata(name)['size']
+
+    def get_available_name(self, name, max_length=None):
+        return self.remote.get_available_name(name, max_length=max_length)
+
+    def get_valid_name(self, name):
+        return self.remote.get_valid_name(name)
+
+    def generate_filename(self, filename):
+        return self.remote.generate_filename(filename)
+
+    def listdir(self, path):
+        return self.remote.listdir(path)
+
+    def list_files(self, path):
+        """Return the names of all the remote files under the path."""
+        return list_files(self.remote, path)
+
+    def url(self, name):
+        return self.remote.url(name)
+
+    def get_accessed_time(self, name):
+        return self.remote.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.remote.get_created_time(name)
+
+    def get_modified_time(self, name):
+        timestamp = self._require_metadata(name)['modified']
+        if settings.USE_TZ:
+            return datetime.fromtimestamp(timestamp, timezone.utc)
+        return datetime.fromtimestamp(timestamp)
@@ -0,0 +1,137 @@
+"""Module with the unit test cases of the cache configuration."""
+import os
+import shutil
+import tempfile
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings, tag
+
+from django_base.libs.cache_url import code_version, parse_cache_url
+
+
+@tag('unit')
+class ParseCacheURLTest(SimpleTestCase):
+    """Unit test case of the parse_cache_url function."""
+
+    def test_locmem(self):
+        """Test the local memory cache of the development."""
+        self.assertEqual(parse_cache_url('locmem://'), {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': '',
+        })
+
+    def test_memcached(self):
+        """Test the memcached servers and the settings of the query."""
+        self.assertEqual(
+            parse_cache_url('memcached://a:11211,b:11211?timeout=60&'
+                            'key_prefix=v1&MAX_ENTRIES=100'), {
+                'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+                'LOCATION': ['a:11211', 'b:11211'],
+                'TIMEOUT': 60,
+                'KEY_PREFIX': 'v1',
+                'OPTIONS': {'MAX_ENTRIES': 100},
+            })
+
+    def test_redis(self):
+        """Test the redis URL is the location."""
+        cache = parse_cache_url('redis://:secret@host:6379/1?timeout=30')
+        self.assertEqual(cache['LOCATION'], 'redis://:secret@host:6379/1')
+        self.assertEqual(cache['TIMEOUT'], 30)
+
+    def test_file(self):
+        """Test the file cache directory."""
+        self.assertEqual(parse_cache_url('file:///var/tmp/cache')['LOCATION'],
+                         '/var/tmp/cache')
+
+    def test_unknown_scheme(self):
+        """Test the unknown schemes raise ImproperlyConfigured."""
+        with self.assertRaises(ImproperlyConfigured):
+            parse_cache_url('mongodb://host')
+
+
+@tag('unit')
+class CodeVersionTest(SimpleTestCase):
+    """Unit test case of the code_version function."""
+
+    def setUp(self):
+        """Set up a directory with a module."""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.write('app/views.py', 'VIEW = 1\n')
+
+    def write(self, name, content):
+        """Write the content to the file of the directory."""
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as code_file:
+            code_file.write(content)
+
+    def test_changes_with_the_code(self):
+        """Test the version changes with the code and the templates only."""
+        version = code_version(self.directory)
+        self.write('app/__pycache__/views.pyc', 'compiled')
+        self.write('app/media/photo.jpg', 'photo')
+        self.assertEqual(code_version(self.directory), version)
+
+        self.write('static/views.py', 'collected')
+        self.assertEqual(code_version(self.directory,
+                                      exclude=('__pycache__', 'static')),
+                         version)
+
+        self.write('app/templates/page.html', '<p></p>')
+        self.assertNotEqual(code_version(self.directory), version)
+        version = code_version(self.directory)
+        self.write('app/views.py', 'VIEW = 2\n')
+        self.assertNotEqual(code_version(self.directory), version)
+
+
+@tag('unit')
+@override_settings(CACHES={
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+               'LOCATION': 'tiered-test', 'KEY_PREFIX': 'v2'},
+    'default': {'BACKEND': 'django_base.libs.cache.TieredCache',
+                'OPTIONS': {'L2': 'shared', 'L1_TIMEOUT': 5,
+                            'L1_EXCLUDE': ['lock:']}},
+})
+class TieredCacheTest(SimpleTestCase):
+    """Unit test case of the TieredCache class."""
+
+    def setUp(self):
+        """Set up the tiered cache and the shared cache behind it."""
+        self.cache = caches['default']
+        self.shared = caches['shared']
+        self.cache.clear()
+
+    def test_read_through(self):
+        """Test the values of the shared cache are kept in memory."""
+        self.shared.set('key', 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.shared.set('key', 'changed')
+        self.assertEqual(self.cache.get('key'), 'value')
+
+    def test_write_through(self):
+        """Test the writes go to the shared cache with its prefix."""
+        self.cache.set('key', 'value')
+        self.assertEqual(self.shared.get('key'), 'value')
+        self.assertEqual(self.shared.make_key('key'), 'v2:1:key')
+
+    def test_delete(self):
+        """Test the deleted values are removed from both tiers."""
+        self.cache.set('key', 'value')
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+        self.assertIsNone(self.shared.get('key'))
+
+    def test_add(self):
+        """Test add only succeeds when the shared cache has no value."""
+        self.shared.set('key', 'other')
+        self.assertFalse(self.cache.add('key', 'value'))
+        self.assertTrue(self.cache.add('new', 'value'))
+        self.assertEqual(self.cache.get('new'), 'value')
+
+    def test_excluded_keys(self):
+        """Test the excluded keys are always read from the shared cache."""
+        self.cache.set('lock:a', 'token')
+        self.shared.delete('lock:a')
+        self.assertIsNone(self.cache.get('lock:a'))
@@ -0,0 +1,43 @@
+"""Module with the unit test cases of the functions that write files."""
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, tag
+
+from django_base.libs.files import write_atomic
+
+
+@tag('unit')
+class WriteAtomicTest(SimpleTestCase):
+    """Unit test case of the write_atomic function."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_write(self):
+        """Test the bytes and the files are written with their directory."""
+        path = os.path.join(self.directory, 'css', 'main.css')
+        self.assertEqual(write_atomic(path, b'a{}'), 3)
+        self.assertEqual(write_atomic(path, ContentFile(b'body{}')), 6)
+
+        with open(path, 'rb') as written:
+            self.assertEqual(written.read(), b'body{}')
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['main.css'])
+
+    def test_failed_write(self):
+        """Test a failed write keeps the file and removes the temporary."""
+        path = os.path.join(self.directory, 'main.css')
+        write_atomic(path, b'a{}')
+
+        with mock.patch('os.replace', side_effect=OSError), \
+                self.assertRaises(OSError):
+            write_atomic(path, b'body{}')
+
+        with open(path, 'rb') as written:
+            self.assertEqual(written.read(), b'a{}')
+        self.assertEqual(os.listdir(self.directory), ['main.css'])
@@ -0,0 +1,64 @@
+"""Module with the unit test cases of the minifiers."""
+from django.test import SimpleTestCase, tag
+
+from django_base.libs.minify import minify_css, minify_js, minify_svg
+
+
+@tag('unit')
+class MinifyCSSTest(SimpleTestCase):
+    """Unit test case of the minify_css function."""
+
+    def test_comments_and_spaces(self):
+        """Test the comments and the spaces around punctuation are removed."""
+        self.assertEqual(
+            minify_css('/* Header */\nh1 , h2 > a {\n  color : red ;\n}\n'),
+            'h1,h2>a{color :red}')
+
+    def test_strings_kept(self):
+        """Test the strings are kept as they are."""
+        self.assertEqual(minify_css('a::after { content: "/*  x  */"; }'),
+                         'a::after{content:"/*  x  */"}')
+
+    def test_descendant_pseudo_class(self):
+        """Test the space before the colon of a selector is kept."""
+        self.assertEqual(minify_css('div :first-child { margin: 0 auto; }'),
+                         'div :first-child{margin:0 auto}')
+
+
+@tag('unit')
+class MinifySVGTest(SimpleTestCase):
+    """Unit test case of the minify_svg function."""
+
+    def test_prolog_and_editor_attributes(self):
+        """Test the prolog, comments and editor attributes are removed."""
+        svg = ('<?xml version="1.0"?>\n<!-- Generator -->\n'
+               '<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" "svg11.dtd">\n'
+               '<svg version="1.1" x="0px" y="0px" viewBox="0 0 10 10" '
+               'style="enable-background:new 0 0 10 10;" xml:space="preserve">\n'
+               '<g>\n\t<path d="M0 0h10"/>\n</g>\n</svg>\n')
+        self.assertEqual(minify_svg(svg),
+                         '<svg viewBox="0 0 10 10"><g><path d="M0 0h10"/></g></svg>')
+
+    def test_other_elements_kept(self):
+        """Test the attributes of the elements but the root are kept."""
+        svg = ('<svg x="0" versioned="2"><mask x="0" y="0"/>'
+               '<text xml:space="preserve"> a</text></svg>')
+        self.assertEqual(minify_svg(svg),
+                         '<svg versioned="2"><mask x="0" y="0"/>'
+                         '<text xml:space="preserve"> a</text></svg>')
+
+
+@tag('unit')
+class MinifyJSTest(SimpleTestCase):
+    """Unit test case of the minify_js function."""
+
+    def test_indentation_and_blank_lines(self):
+        """Test the indentation and the blank lines are removed."""
+        self.assertEqual(minify_js('(function() {\n    var a = 1;\n\n'
+                                   '    return a\n})();\n'),
+                         '(function() {\nvar a = 1;\nreturn a\n})();')
+
+    def test_multiline_strings_kept(self):
+        """Test the code with multiline strings is kept as it is."""
+        for js in ('var a = `x\n    y`;', 'var a = "x\\\n    y";'):
+            self.assertEqual(minify_js(js), js)
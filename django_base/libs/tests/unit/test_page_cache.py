@@ -0,0 +1,82 @@
+"""Module with the unit test cases of the page cache."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, tag
+
+from django_base.libs.cache import cache_anonymous_page, xfetch
+
+
+@tag('unit')
+class XFetchTest(SimpleTestCase):
+    """Unit test case of the xfetch function."""
+
+    def setUp(self):
+        """Clear the cache."""
+        cache.clear()
+
+    def test_cached(self):
+        """Test the value is computed once."""
+        recompute = mock.Mock(return_value='value')
+        self.assertEqual(xfetch('key', recompute, 60), 'value')
+        self.assertEqual(xfetch('key', recompute, 60), 'value')
+        recompute.assert_called_once()
+
+    def test_none_not_cached(self):
+        """Test the None values aren't cached."""
+        recompute = mock.Mock(return_value=None)
+        xfetch('key', recompute, 60)
+        xfetch('key', recompute, 60)
+        self.assertEqual(recompute.call_count, 2)
+
+    def test_early_recomputation(self):
+        """Test the value is recomputed before the expiry by chance."""
+        cache.set('key', ('old', 1.0, 1000.0), 60)
+        recompute = mock.Mock(return_value='new')
+        with mock.patch('time.time', return_value=995.0):
+            # -log(1 - 0.5) * 1.0 is 0.69 seconds, before the expiry.
+            with mock.patch('random.random', return_value=0.5):
+                self.assertEqual(xfetch('key', recompute, 60, beta=1.0), 'old')
+            # -log(1 - 0.999) * 1.0 is 6.9 seconds, after the expiry.
+            with mock.patch('random.random', return_value=0.999):
+                self.assertEqual(xfetch('key', recompute, 60, beta=1.0), 'new')
+
+
+@tag('unit')
+class CacheAnonymousPageTest(SimpleTestCase):
+    """Unit test case of the cache_anonymous_page decorator."""
+
+    def setUp(self):
+        """Set up a view that counts its calls."""
+        cache.clear()
+        self.calls = 0
+
+        def view(request):
+            self.calls += 1
+            return HttpResponse(f'page {self.calls}', content_type='text/plain')
+
+        self.view = cache_anonymous_page(60)(view)
+        self.factory = RequestFactory()
+
+    def test_anonymous_cached(self):
+        """Test the anonymous requests get the cached page."""
+        self.view(self.factory.get('/'))
+        response = self.view(self.factory.get('/'))
+        self.assertEqual(response.content, b'page 1')
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(self.calls, 1)
+
+    def test_keyed_by_host(self):
+        """Test each host has its page."""
+        self.view(self.factory.get('/', HTTP_HOST='a.example.com'))
+        response = self.view(self.factory.get('/', HTTP_HOST='b.example.com'))
+        self.assertEqual(response.content, b'page 2')
+
+    def test_authenticated_bypass(self):
+        """Test the authenticated users skip the cache."""
+        self.view(self.factory.get('/'))
+        request = self.factory.get('/', HTTP_COOKIE='sessionid=abc')
+        request.user = mock.Mock(is_authenticated=True)
+        self.assertEqual(self.view(request).content, b'page 2')
+        self.assertEqual(self.view(self.factory.get('/')).content, b'page 1')
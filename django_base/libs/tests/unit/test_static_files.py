@@ -0,0 +1,126 @@
+"""Module with the unit test cases of the static files served by the app."""
+import os
+import gzip
+import shutil
+import tempfile
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings, tag
+
+from django_base.libs.middleware import StaticFilesMiddleware
+from django_base.libs.storage import CompressedManifestStaticFilesStorage
+
+CSS = b'body { color: red; }\n' * 50
+
+
+@tag('unit')
+class CompressedStaticFilesTest(SimpleTestCase):
+    """Unit test case of the compressed static storages."""
+
+    def setUp(self):
+        """Set up a storage with a CSS file in a temporary directory."""
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        os.makedirs(os.path.join(self.location, 'css'))
+        with open(os.path.join(self.location, 'css', 'a.css'), 'wb') as css:
+            css.write(CSS)
+        with open(os.path.join(self.location, 'css', 'b.png'), 'wb') as png:
+            png.write(b'png')
+        self.storage = CompressedManifestStaticFilesStorage(
+            location=self.location)
+
+    def post_process(self):
+        """Post process the files and return the compressed names."""
+        paths = {name: (self.storage, name) for name in ('css/a.css', 'css/b.png')}
+        return [processed_name for _, processed_name, _
+                in self.storage.post_process(paths)
+                if processed_name.endswith('.gz')]
+
+    def test_compressed_copies(self):
+        """Test the text files and their hashed names are compressed."""
+        compressed = self.post_process()
+        hashed_name = self.storage.stored_name('css/a.css')
+        self.assertEqual(sorted(compressed),
+                         sorted(['css/a.css.gz', f'{hashed_name}.gz']))
+        with gzip.open(self.storage.path(f'{hashed_name}.gz')) as copy:
+            self.assertEqual(copy.read(), CSS)
+
+    def test_unchanged_files_skipped(self):
+        """Test the files compressed before aren't compressed again."""
+        self.post_process()
+        self.assertEqual(self.post_process(), [])
+
+    def test_stale_copy_removed(self):
+        """Test the copy of a file changed to an uncompressible content is
+        removed."""
+        self.post_process()
+        path = os.path.join(self.location, 'css', 'a.css')
+        with open(path, 'wb') as css:
+            css.write(b'a{}')
+        os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+        self.post_process()
+        self.assertFalse(os.path.exists(f'{path}.gz'))
+
+
+@tag('unit')
+@override_settings(DEBUG=False, STATIC_URL='/static/', STATIC_MAX_AGE=60)
+class StaticFilesMiddlewareTest(SimpleTestCase):
+    """Unit test case of the StaticFilesMiddleware class."""
+
+    def setUp(self):
+        """Set up a static root with a plain, a hashed and a gzipped file."""
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        os.makedirs(os.path.join(self.location, 'css'))
+        for name, content in (('css/a.css', CSS),
+                              ('css/a.0123456789ab.css', CSS),
+                              ('css/a.0123456789ab.css.gz', gzip.compress(CSS))):
+            with open(os.path.join(self.location, name), 'wb') as static_file:
+                static_file.write(content)
+
+        override = override_settings(STATIC_ROOT=self.location)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.middleware = StaticFilesMiddleware(
+            lambda request: HttpResponse('view'))
+        self.factory = RequestFactory()
+
+    def test_serves_file(self):
+        """Test a file is served with its ETag and a short max-age."""
+        response = self.middleware(self.factory.get('/static/css/a.css'))
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_serves_compressed_copy(self):
+        """Test the gzip copy of a hashed file is immutable."""
+        response = self.middleware(self.factory.get(
+            '/static/css/a.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip, br'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Cache-Control'],
+                         'public, max-age=31536000, immutable')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)),
+                         CSS)
+
+    def test_not_modified(self):
+        """Test the requests with the ETag get a 304."""
+        etag = self.middleware(self.factory.get('/static/css/a.css'))['ETag']
+        response = self.middleware(self.factory.get(
+            '/static/css/a.css', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+
+    def test_other_paths(self):
+        """Test the other paths go to the views."""
+        for path in ('/', '/static/css/missing.css', '/static/../settings.py'):
+            self.assertEqual(self.middleware(self.factory.get(path)).content,
+                             b'view')
+
+    @override_settings(DEBUG=True)
+    def test_not_used_in_debug(self):
+        """Test the middleware isn't used in DEBUG."""
+        with self.assertRaises(MiddlewareNotUsed):
+            StaticFilesMiddleware(lambda request: None)
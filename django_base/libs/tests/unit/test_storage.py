@@ -0,0 +1,228 @@
+"""Module with the unit test cases of the storage classes."""
+import io
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, tag
+
+from django_base.libs.storage import (
+    CachedFileSystemStorage, LocalCacheStorage, MediaStorage, StaticStorage,
+    list_files, open_or_none, reset_connections)
+
+
+@tag('unit')
+class MetadataCacheTest(SimpleTestCase):
+    """Unit test case of the MetadataCacheMixin class."""
+
+    def setUp(self):
+        """Set up a storage in a temporary directory."""
+        cache.clear()
+        self.location = tempfile.mkdtemp()
+        self.storage = CachedFileSystemStorage(location=self.location)
+        self.storage.save('a.jpg', ContentFile(b'data'))
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.location)
+
+    def test_metadata_cached(self):
+        """Test the metadata is read from the storage only once."""
+        with mock.patch.object(self.storage, '_fetch_metadata',
+                               wraps=self.storage._fetch_metadata) as fetch:
+            self.assertTrue(self.storage.exists('a.jpg'))
+            self.assertEqual(self.storage.size('a.jpg'), 4)
+            self.storage.get_modified_time('a.jpg')
+            self.storage.etag('a.jpg')
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_save_invalidates(self):
+        """Test saving a file replaces its cached metadata."""
+        self.assertEqual(self.storage.size('a.jpg'), 4)
+        self.storage.delete('a.jpg')
+        self.assertFalse(self.storage.exists('a.jpg'))
+        self.storage.save('a.jpg', ContentFile(b'new data'))
+        self.assertEqual(self.storage.size('a.jpg'), 8)
+
+    def test_missing_file(self):
+        """Test the missing files raise FileNotFoundError."""
+        self.assertFalse(self.storage.exists('b.jpg'))
+        with self.assertRaises(FileNotFoundError):
+            self.storage.size('b.jpg')
+
+    def test_open_or_none(self):
+        """Test open_or_none opens the file and caches its metadata."""
+        with mock.patch.object(self.storage, '_fetch_metadata',
+                               wraps=self.storage._fetch_metadata) as fetch:
+            with open_or_none(self.storage, 'a.jpg') as file:
+                self.assertEqual(file.read(), b'data')
+            self.assertIsNone(open_or_none(self.storage, 'b.jpg'))
+            self.assertFalse(self.storage.exists('b.jpg'))
+            self.assertEqual(self.storage.size('a.jpg'), 4)
+        self.assertEqual(fetch.call_count, 1)
+
+
+@tag('unit')
+class LocalCacheStorageTest(SimpleTestCase):
+    """Unit test case of the LocalCacheStorage class."""
+
+    def setUp(self):
+        """Set up a cache in front of a storage in a temporary directory."""
+        self.location = tempfile.mkdtemp()
+        self.remote = FileSystemStorage(location=os.path.join(self.location,
+                                                              'remote'))
+        self.storage = LocalCacheStorage(
+            self.remote, os.path.join(self.location, 'local'), max_size=10)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.location)
+
+    def copy_path(self, name):
+        """Return the path of the local copy of the current file."""
+        return self.storage.local_path(name, self.storage.etag(name))
+
+    def test_read_through(self):
+        """Test a file of the remote storage is copied on the first read."""
+        self.remote.save('a.jpg', ContentFile(b'data'))
+        with self.storage.open('a.jpg') as file:
+            self.assertEqual(file.read(), b'data')
+        with mock.patch.object(self.remote, 'open') as remote_open:
+            with self.storage.open('a.jpg') as file:
+                self.assertEqual(file.read(), b'data')
+        remote_open.assert_not_called()
+
+    def test_replaced_file(self):
+        """Test a file replaced under the same name isn't read from its copy."""
+        self.remote.save('a.jpg', ContentFile(b'data'))
+        self.storage.open('a.jpg').close()
+        self.remote.delete('a.jpg')
+        self.remote.save('a.jpg', ContentFile(b'new data'))
+        with self.storage.open('a.jpg') as file:
+            self.assertEqual(file.read(), b'new data')
+        self.assertEqual(self.storage.size('a.jpg'), 8)
+        self.assertEqual(self.storage.get_modified_time('a.jpg'),
+                         self.remote.get_modified_time('a.jpg'))
+
+    def test_write_through(self):
+        """Test a saved file goes to the remote storage and to the copies."""
+        name = self.storage.save('a.jpg', ContentFile(b'data'))
+        self.assertTrue(self.remote.exists(name))
+        self.assertTrue(os.path.exists(self.copy_path(name)))
+
+    def test_write_file_object(self):
+        """Test any file-like object can be saved."""
+        name = self.storage.save('a.txt', io.BytesIO(b'hello'))
+        with open(self.copy_path(name), 'rb') as copy:
+            self.assertEqual(copy.read(), b'hello')
+
+    def test_missing_file(self):
+        """Test the missing files raise FileNotFoundError."""
+        self.assertIsNone(open_or_none(self.storage, 'a.jpg'))
+        with self.assertRaises(FileNotFoundError):
+            self.storage.open('a.jpg')
+
+    def test_delete(self):
+        """Test deleting a file removes the remote file and the copy."""
+        self.storage.save('a.jpg', ContentFile(b'data'))
+        self.storage.delete('a.jpg')
+        self.assertFalse(self.storage.exists('a.jpg'))
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used copies are removed over the limit."""
+        self.storage.save('a.jpg', ContentFile(b'aaaa'))
+        self.storage.save('b.jpg', ContentFile(b'bbbb'))
+        os.utime(self.copy_path('a.jpg'), (0, 0))
+        os.utime(self.copy_path('b.jpg'), (1, 1))
+        self.storage.open('a.jpg').close()
+        self.storage.save('c.jpg', ContentFile(b'cccc'))
+        self.assertTrue(os.path.exists(self.copy_path('a.jpg')))
+        self.assertFalse(os.path.exists(self.copy_path('b.jpg')))
+        self.assertTrue(self.remote.exists('b.jpg'))
+
+
+@tag('unit')
+class SharedConnectionTest(SimpleTestCase):
+    """Unit test case of the SharedConnectionMixin class."""
+
+    def test_config(self):
+        """Test the storages use the shared client configuration."""
+        with self.settings(AWS_S3_MAX_POOL_CONNECTIONS=64):
+            storage = MediaStorage()
+        self.assertEqual(storage.config.max_pool_connections, 64)
+        self.assertEqual(storage.config.retries['mode'], 'standard')
+        self.assertEqual(storage.config.retries['total_max_attempts'], 3)
+
+    def test_connections_shared(self):
+        """Test the storages share the client and the thread resources."""
+        static, media = StaticStorage(), MediaStorage()
+        self.assertIs(static.connection, media.connection)
+        self.assertIs(static.client, media.client)
+
+        other = {}
+        thread = threading.Thread(target=lambda: other.update(
+            connection=media.connection, client=media.client))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other['connection'], media.connection)
+        self.assertIs(other['client'], media.client)
+
+    def test_bucket_of_thread(self):
+        """Test the bucket uses the resource of the current thread."""
+        media = MediaStorage()
+        self.assertIs(media.bucket.meta.client, media.connection.meta.client)
+        other = {}
+        thread = threading.Thread(target=lambda: other.update(
+            bucket=media.bucket, connection=media.connection))
+        thread.start()
+        thread.join()
+        self.assertIs(other['bucket'].meta.client,
+                      other['connection'].meta.client)
+        self.assertIsNot(other['bucket'].meta.client,
+                         media.bucket.meta.client)
+
+    def test_reset_connections(self):
+        """Test the connections of the process are opened again."""
+        media = MediaStorage()
+        client, connection = media.client, media.connection
+        reset_connections(media)
+        self.assertIsNot(media.client, client)
+        self.assertIsNot(media.connection, connection)
+
+    def test_list_files(self):
+        """Test the files are listed with a request per page of keys."""
+        media = MediaStorage()
+        media.location = 'media'
+        pages = [{'Contents': [{'Key': 'media/photos/a.jpg'},
+                               {'Key': 'media/photos/sub/b.jpg'}]}, {}]
+        with mock.patch.object(MediaStorage, 'client',
+                               new_callable=mock.PropertyMock) as client:
+            client.return_value.get_paginator.return_value.paginate \
+                .return_value = pages
+            self.assertEqual(list_files(media, 'photos'),
+                             ['photos/a.jpg', 'photos/sub/b.jpg'])
+        client.return_value.get_paginator.return_value.paginate \
+            .assert_called_once_with(Bucket=media.bucket_name,
+                                     Prefix='media/photos/')
+
+
+@tag('unit')
+class ListFilesTest(SimpleTestCase):
+    """Unit test case of the list_files function."""
+
+    def test_walks_directories(self):
+        """Test the storages without listing walk the directories."""
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        for name in ('photos/b.jpg', 'photos/sub/c.jpg', 'photos/a.jpg'):
+            storage.save(name, ContentFile(b'data'))
+        self.assertEqual(list_files(storage, 'photos'), [
+            'photos/a.jpg', 'photos/b.jpg', 'photos/sub/c.jpg'])
+        with self.assertRaises(FileNotFoundError):
+            list_files(storage, 'missing')
@@ -20,6 +20,8 @@ from dj_database_url import parse as dburl
 
 from django.utils.translation import ugettext_lazy as _
 
+from django_base.libs.cache_url import code_version, parse_cache_url
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -62,6 +64,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django_base.libs.middleware.StaticFilesMiddleware',
+    'django_base.libs.middleware.PreloadMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -109,6 +113,54 @@ GDAL_LIBRARY_PATH = os.getenv('GDAL_LIBRARY_PATH')
 GEOS_LIBRARY_PATH = os.getenv('GEOS_LIBRARY_PATH')
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+# The cache shared by the processes (e.g. memcached://host:11211, or
+# redis://host:6379/0 with django-redis), locmem:// in development and tests.
+CACHE_URL = config('CACHE_URL', default='locmem://')
+
+# Version of the static files of the apps (a hash of their content by
+# default), part of the default CACHE_VERSION as the cached pages have their
+# CSS and SVG inline.
+STATIC_VERSION = config('STATIC_VERSION', default='') or \
+    code_version(BASE_DIR / 'django_base' / 'apps', ('.css', '.js', '.svg'))
+
+# Prefix of the keys, changed in each deploy so the new code never reads the
+# entries of the previous one. By default it is the Heroku release version,
+# only set with the runtime-dyno-metadata labs feature, or else a hash of the
+# code and templates of the project (without the media and the collected
+# static files) with the STATIC_VERSION.
+CACHE_VERSION = config('CACHE_VERSION', default='') or \
+    config('HEROKU_RELEASE_VERSION', default='') or \
+    code_version(BASE_DIR / 'django_base',
+                 exclude=('__pycache__', 'media', 'static')) + \
+    f'-{STATIC_VERSION}'
+
+# Seconds the values read from the shared cache are kept in the memory of the
+# process (0 disables it), and how many values are kept.
+CACHE_L1_TIMEOUT = config('CACHE_L1_TIMEOUT', default=5, cast=int)
+CACHE_L1_MAX_ENTRIES = config('CACHE_L1_MAX_ENTRIES', default=1000, cast=int)
+
+CACHES = {
+    'shared': {'KEY_PREFIX': CACHE_VERSION, **parse_cache_url(CACHE_URL)},
+}
+
+if CACHE_L1_TIMEOUT:
+    CACHES['default'] = {
+        'BACKEND': 'django_base.libs.cache.TieredCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_TIMEOUT': CACHE_L1_TIMEOUT,
+            'L1_MAX_ENTRIES': CACHE_L1_MAX_ENTRIES,
+            # The locks are always read from the shared cache.
+            'L1_EXCLUDE': ['thumbnail:lock:'],
+        },
+    }
+else:
+    CACHES['default'] = CACHES['shared']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -178,17 +230,51 @@ STATIC_URL = '/static/'
 
 STATIC_AWS_BUCKET = config('STATIC_AWS_BUCKET', default='')
 
-DEFAULT_STATICFILES_STORAGE_VALUE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+# django_base.libs.storage.ManifestStaticStorage uploads the static files to
+# S3 with content-hashed names, cached by the browsers for a year. The local
+# storages keep them in STATIC_ROOT, served by StaticFilesMiddleware with the
+# compressed copies (and hashed names with CompressedManifestStaticFilesStorage).
+DEFAULT_STATICFILES_STORAGE_VALUE = 'django_base.libs.storage.CompressedStaticFilesStorage'
 STATICFILES_STORAGE = config('STATICFILES_STORAGE', default=DEFAULT_STATICFILES_STORAGE_VALUE)
 
-if STATICFILES_STORAGE == DEFAULT_STATICFILES_STORAGE_VALUE:
+LOCAL_STATICFILES_STORAGES = (
+    DEFAULT_STATICFILES_STORAGE_VALUE,
+    'django_base.libs.storage.CompressedManifestStaticFilesStorage',
+    'django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+
+if STATICFILES_STORAGE in LOCAL_STATICFILES_STORAGES:
     STATIC_ROOT = os.path.join(BASE_DIR, 'django_base', 'static')
 
+# Seconds the browsers cache the static files without hashed names.
+STATIC_MAX_AGE = config('STATIC_MAX_AGE', default=60, cast=int)
+
+# JavaScript bundles built by the bundle_js command for each language of
+# LANGUAGES, and used with the js_bundle tag. The {locale} of the names is
+# the locale of the language (JS_BUNDLE_LOCALES, the language by default),
+# the localized files that don't exist are left out of the bundle.
+JS_BUNDLES = {
+    'account/signup': [
+        'account/js/jquery.min.js',
+        'account/js/jquery-validate/jquery.validate.min.js',
+        'account/js/jquery-validate/localization/messages_{locale}.min.js',
+        'account/js/signup.js',
+    ],
+}
+JS_BUNDLE_LOCALES = {
+    'pt': 'pt_BR',
+}
+
 
 STATICFILES_DIRS = (
     os.path.join(BASE_DIR, 'django_base/apps/website/static'),
 )
 
+# Directory of the hashes of the files uploaded by the collectstatic_parallel
+# command (a temporary directory by default). Keep it between the deploys,
+# bin/post_compile sets it to the build cache on Heroku.
+COLLECTSTATIC_HASHES = config('COLLECTSTATIC_HASHES', default='')
+
 MEDIA_URL = '/media/'
 
 MEDIA_AWS_BUCKET = config('MEDIA_AWS_BUCKET', default='')
@@ -208,4 +294,71 @@ AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default='')
 AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY', default='')
 
 STATIC_CUSTOM_DOMAIN = config('STATIC_CUSTOM_DOMAIN', default='')
-MEDIA_CUSTOM_DOMAIN = config('MEDIA_CUSTOM_DOMAIN', default='')
\ No newline at end of file
+MEDIA_CUSTOM_DOMAIN = config('MEDIA_CUSTOM_DOMAIN', default='')
+
+# Connections of the S3 storages, shared by their threads: the size of the
+# pool (at least the number of threads reading at the same time), the
+# timeouts in seconds, the TCP keep-alive and the retries ('legacy',
+# 'standard' or 'adaptive' mode, with the total number of attempts).
+AWS_S3_MAX_POOL_CONNECTIONS = config('AWS_S3_MAX_POOL_CONNECTIONS', default=50, cast=int)
+AWS_S3_CONNECT_TIMEOUT = config('AWS_S3_CONNECT_TIMEOUT', default=5, cast=float)
+AWS_S3_READ_TIMEOUT = config('AWS_S3_READ_TIMEOUT', default=30, cast=float)
+AWS_S3_TCP_KEEPALIVE = config('AWS_S3_TCP_KEEPALIVE', default=True, cast=bool)
+AWS_S3_RETRY_MODE = config('AWS_S3_RETRY_MODE', default='standard')
+AWS_S3_MAX_ATTEMPTS = config('AWS_S3_MAX_ATTEMPTS', default=3, cast=int)
+
+# Seconds the media storage keeps the metadata (existence, size, ETag and
+# modified time) of the files in the cache, and of the missing files.
+STORAGE_METADATA_TTL = config('STORAGE_METADATA_TTL', default=300, cast=int)
+STORAGE_METADATA_MISSING_TTL = config('STORAGE_METADATA_MISSING_TTL', default=10,
+                                      cast=int)
+
+# Local disk cache of the media files (DEFAULT_FILE_STORAGE set to
+# django_base.libs.storage.LocalCacheStorage): the storage it caches, the
+# directory of the copies (a temporary directory by default) and their size
+# limit in bytes.
+STORAGE_CACHE_REMOTE = config('STORAGE_CACHE_REMOTE',
+                              default='django_base.libs.storage.MediaStorage')
+STORAGE_CACHE_DIR = config('STORAGE_CACHE_DIR', default='')
+STORAGE_CACHE_MAX_SIZE = config('STORAGE_CACHE_MAX_SIZE', default=1024 * 1024 * 1024,
+                                cast=int)
+
+
+# Seconds the pages of the anonymous users are cached (see
+# django_base.libs.cache.cache_anonymous_page), and how early they are
+# recomputed before expiring (XFetch beta, greater is earlier).
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=300, cast=int)
+XFETCH_BETA = config('XFETCH_BETA', default=1.0, cast=float)
+
+
+# Thumbnails
+
+PHOTO_DIR = config('PHOTO_DIR', default='photos')
+
+# Directory (in the media storage) where the rendered thumbnails are kept.
+THUMBNAIL_DIR = config('THUMBNAIL_DIR', default='thumbnails')
+
+# Lock used to render each thumbnail only once at a time: 'cache' (the Django
+# cache) or 'file' (lock files in THUMBNAIL_LOCK_DIR, on a local disk).
+THUMBNAIL_LOCK = config('THUMBNAIL_LOCK', default='cache')
+THUMBNAIL_LOCK_DIR = config('THUMBNAIL_LOCK_DIR', default='')
+
+# Seconds a render can hold the lock and seconds the other requests wait.
+THUMBNAIL_LOCK_TIMEOUT = config('THUMBNAIL_LOCK_TIMEOUT', default=30, cast=int)
+THUMBNAIL_LOCK_WAIT = config('THUMBNAIL_LOCK_WAIT', default=10, cast=int)
+
+# Number of threads where the async thumbnail view renders the images, and
+# whether the thumbnail URL uses it (for ASGI deployments).
+THUMBNAIL_THREAD_POOL_SIZE = config('THUMBNAIL_THREAD_POOL_SIZE',
+                                    default=os.cpu_count() or 1, cast=int)
+THUMBNAIL_ASYNC = config('THUMBNAIL_ASYNC', default=False, cast=bool)
+
+# Limits of the thumbnail renders: the largest source accepted (in bytes and
+# in pixels), the number of renders at the same time in each process and the
+# seconds a request waits for a render slot before getting a 503.
+THUMBNAIL_MAX_FILE_SIZE = config('THUMBNAIL_MAX_FILE_SIZE', default=50 * 1024 * 1024,
+                                 cast=int)
+THUMBNAIL_MAX_PIXELS = config('THUMBNAIL_MAX_PIXELS', default=50000000, cast=int)
+THUMBNAIL_MAX_RENDERS = config('THUMBNAIL_MAX_RENDERS', default=os.cpu_count() or 1,
+                               cast=int)
+THUMBNAIL_RENDER_WAIT = config('THUMBNAIL_RENDER_WAIT', default=5, cast=int)
@@ -1 +1,4 @@
+set -e
+
 python manage.py migrate
+python manage.py pregenerate_thumbnails